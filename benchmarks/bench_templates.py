@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Compares the rendering of serializers through the simple template fast
+path and through Jinja2.
+
+Run it with ``python benchmarks/bench_templates.py``.
+"""
+
+import timeit
+
+import jinja2
+
+from punch import templates
+
+SERIALIZERS = [
+    '{{major}}.{{minor}}.{{patch}}',
+    '__version__ = "{{ major }}.{{ minor }}.{{ patch }}"',
+    'Release {{major}}.{{minor}} build {{build}}',
+]
+
+VERSION = {'major': 1, 'minor': 4, 'patch': 6, 'build': 12}
+
+NUMBER = 100000
+
+
+def bench(name, statement, unit, number=NUMBER):
+    seconds = min(timeit.repeat(statement, number=number, repeat=3))
+    print("  {:<10} {:8.3f} us/{}".format(
+        name, seconds / number * 1000000, unit))
+
+
+def main():
+    environment = jinja2.Environment()
+
+    for serializer in SERIALIZERS:
+        simple = templates.SimpleTemplate.from_source(serializer)
+        jinja = environment.from_string(serializer)
+
+        assert simple.render(**VERSION) == jinja.render(**VERSION)
+
+        print(serializer)
+        bench("fast path", lambda: simple.render(**VERSION), "render")
+        bench("jinja2", lambda: jinja.render(**VERSION), "render")
+        bench("fast path",
+              lambda: templates.SimpleTemplate.from_source(serializer),
+              "compile", 1000)
+        bench("jinja2",
+              lambda: environment.from_string(serializer),
+              "compile", 1000)
+
+
+if __name__ == '__main__':
+    main()
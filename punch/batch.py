@@ -0,0 +1,266 @@
+import argparse
+import collections
+import io
+import json
+import os
+import sys
+import threading
+
+from punch import config as cfr
+from punch import file_updater as fu
+from punch import replacer as rep
+from punch import version as ver
+from punch import version_file as vf
+
+JOB_FIELDS = [
+    'directory', 'config_file', 'version_file',
+    'part', 'set_part', 'reset_on_set', 'action'
+]
+
+
+class Job(collections.namedtuple('Job', JOB_FIELDS)):
+
+    @classmethod
+    def from_dict(cls, dic, base_directory=None):
+        unknown_keys = set(dic) - set(JOB_FIELDS)
+        if unknown_keys:
+            raise ValueError("Unknown job keys {}".format(
+                ", ".join(sorted(unknown_keys))))
+
+        directory = dic.get('directory', os.curdir)
+        if base_directory is not None:
+            directory = os.path.join(base_directory, directory)
+
+        job = cls(
+            directory=directory,
+            config_file=dic.get('config_file'),
+            version_file=dic.get('version_file', 'punch_version.py'),
+            part=dic.get('part'),
+            set_part=dic.get('set_part'),
+            reset_on_set=dic.get('reset_on_set', False),
+            action=dic.get('action')
+        )
+
+        if not any([job.part, job.set_part, job.action]):
+            raise ValueError(
+                "Each job shall specify one of part, set_part or action")
+
+        return job
+
+
+JobResult = collections.namedtuple(
+    'JobResult',
+    ['job', 'current_version', 'new_version', 'changed_files', 'exception']
+)
+
+
+def load_manifest(manifest_path):
+    with io.open(manifest_path, 'r', encoding='utf8') as f:
+        manifest = json.load(f)
+
+    if isinstance(manifest, collections.Mapping):
+        manifest = manifest.get('jobs', [])
+
+    # Job directories are relative to the manifest
+    base_directory = os.path.dirname(manifest_path)
+
+    return [Job.from_dict(j, base_directory) for j in manifest]
+
+
+class Batch(object):
+    """Runs many version updates in a single process.
+
+    Configurations are loaded once for all the jobs that share them, and
+    templates, parsers and the Jinja2 environment are shared by all the
+    jobs. VCS releases are run one at a time, as jobs may share the
+    same repository.
+    """
+
+    def __init__(self, jobs=1):
+        self.jobs = jobs
+        self._configs = {}
+        self._configs_lock = threading.Lock()
+        self._vcs_lock = threading.Lock()
+
+    def config(self, job):
+        config_file = job.config_file
+        if config_file is None:
+            config_file = cfr.find_config_file(job.directory)
+        else:
+            config_file = os.path.join(job.directory, config_file)
+
+        key = (os.path.abspath(config_file), os.path.abspath(job.directory))
+
+        with self._configs_lock:
+            config = self._configs.get(key)
+
+        if config is None:
+            config = cfr.PunchConfig(config_file, root=job.directory)
+
+            with self._configs_lock:
+                config = self._configs.setdefault(key, config)
+
+        return config
+
+    def compute_new_version(self, job, config, current_version):
+        new_version = current_version.copy()
+
+        if job.action:
+            from punch import action as act
+
+            action = act.Action.from_dict(dict(config.actions[job.action]))
+            return action.process_version(new_version)
+
+        if job.part:
+            new_version.inc(job.part)
+
+        if job.set_part:
+            if job.reset_on_set:
+                part, value = job.set_part.split('=')
+                new_version.set_and_reset(part, value)
+            else:
+                new_version.set(
+                    dict(i.split('=') for i in job.set_part.split(',')))
+
+        return new_version
+
+    def _use_case(self, job, config, version_strings):
+        from punch import vcs_configuration as vcsc
+        from punch.vcs_repositories import registry
+        from punch.vcs_use_cases import release as ruc
+
+        current_version_string, new_version_string = version_strings
+        vcs_configuration = vcsc.VCSConfiguration.from_dict(
+            config.vcs,
+            config.globals,
+            {
+                'current_version': current_version_string,
+                'new_version': new_version_string
+            }
+        )
+
+        repo = registry.repo_class(vcs_configuration.name)(
+            os.path.abspath(job.directory), vcs_configuration)
+
+        return ruc.VCSReleaseUseCase(repo)
+
+    def apply(self, config, rendered_pairs, version_filepath, new_version):
+        changed_files = []
+        for result in fu.update_files(config.files, rendered_pairs):
+            if result.exception is not None:
+                raise result.exception
+            if result.updated:
+                changed_files.append(result.path)
+
+        vf.write(version_filepath, new_version)
+
+        return changed_files
+
+    def run_job(self, job):
+        try:
+            config = self.config(job)
+            version_filepath = os.path.join(job.directory, job.version_file)
+
+            current_version = ver.Version.from_file(
+                version_filepath, config.version)
+            new_version = self.compute_new_version(
+                job, config, current_version)
+
+            rendered_pairs = rep.RenderedPairs(
+                current_version.as_dict(),
+                new_version.as_dict()
+            )
+            version_strings = rep.Replacer(
+                config.globals['serializer']).get_pairs(rendered_pairs)[0]
+
+            if config.vcs is None:
+                changed_files = self.apply(
+                    config, rendered_pairs, version_filepath, new_version)
+            else:
+                with self._vcs_lock:
+                    use_case = self._use_case(job, config, version_strings)
+                    try:
+                        use_case.pre_start_release()
+                        use_case.start_release()
+
+                        changed_files = self.apply(
+                            config, rendered_pairs, version_filepath,
+                            new_version)
+
+                        use_case.finish_release(
+                            changed_files + [version_filepath])
+                        use_case.post_finish_release()
+                    finally:
+                        # Repositories keep long-lived helper processes
+                        use_case.close()
+        except Exception as exc:
+            return JobResult(job, None, None, [], exc)
+
+        return JobResult(job, version_strings[0], version_strings[1],
+                         changed_files, None)
+
+    def run(self, jobs):
+        "Runs the jobs, yielding the results in the order of the jobs"
+        if self.jobs <= 1:
+            for job in jobs:
+                yield self.run_job(job)
+            return
+
+        import multiprocessing.pool
+
+        pool = multiprocessing.pool.ThreadPool(self.jobs)
+        try:
+            for result in pool.imap(self.run_job, jobs):
+                yield result
+        finally:
+            pool.close()
+            pool.join()
+
+
+def run(jobs, concurrency=1):
+    return Batch(concurrency).run(jobs)
+
+
+def result_to_dict(index, result):
+    dic = {
+        'index': index,
+        'directory': result.job.directory,
+        'status': 'ok' if result.exception is None else 'error',
+    }
+
+    if result.exception is None:
+        dic['current_version'] = result.current_version
+        dic['new_version'] = result.new_version
+        dic['changed_files'] = result.changed_files
+    else:
+        dic['error'] = "{}: {}".format(
+            result.exception.__class__.__name__, result.exception)
+
+    return dic
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='punch batch',
+        description="Runs many version updates listed in a JSON manifest."
+    )
+    parser.add_argument('manifest', help="JSON manifest with the jobs")
+    parser.add_argument('-j', '--jobs', action='store', type=int, default=1,
+                        help="Number of jobs run in parallel")
+
+    args = parser.parse_args(args)
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (IOError, OSError, ValueError) as exc:
+        print("An error occurred while reading the manifest.")
+        print("Exception {}: {}".format(exc.__class__.__name__, str(exc)))
+        sys.exit(1)
+
+    failed = False
+    for index, result in enumerate(run(jobs, args.jobs)):
+        failed = failed or result.exception is not None
+        print(json.dumps(result_to_dict(index, result), sort_keys=True))
+        sys.stdout.flush()
+
+    sys.exit(1 if failed else 0)
@@ -5,16 +5,10 @@ import sys
 
 import os
 import punch
-from punch import config as cfr
-from punch import file_updater as fu
-from punch import replacer as rep
-from punch import vcs_configuration as vcsc
-from punch import version as ver
-from punch import action as act
-from punch.vcs_repositories import exceptions as rex
-from punch.vcs_repositories import git_flow_repo as gfr
-from punch.vcs_repositories import git_repo as gr
-from punch.vcs_use_cases import release as ruc
+
+# The other Punch modules (and their dependencies like jinja2) are
+# imported where they are used, so that invocations like --version
+# and --init do not pay for them
 
 
 def fatal_error(message, exception=None):
@@ -67,17 +61,48 @@ def show_version_updates(version_changes):
 
 
 def main(original_args=None):
+    if original_args is None:
+        original_args = sys.argv[1:]
+
+    if original_args[:1] == ['batch']:
+        from punch import batch
+
+        batch.main(original_args[1:])
+
+    if original_args[:1] == ['workspace']:
+        from punch import workspace
+
+        workspace.main(original_args[1:])
+
     parser = argparse.ArgumentParser(
         description="Manages file content with versions."
     )
     parser.add_argument('-c', '--config-file', action='store',
-                        help="Config file", default=default_config_file_name)
+                        help="Config file (default: the first of" +
+                             " punch_config.py, punch.toml, punch.json" +
+                             " and pyproject.toml with a [tool.punch]" +
+                             " section)")
+    parser.add_argument('--config-cache', action='store',
+                        help="Cache the resolved config file in this file")
     parser.add_argument('-v', '--version-file', action='store',
                         help="Version file", default=default_version_file_name)
     parser.add_argument('-p', '--part', action='store')
     parser.add_argument('--set-part', action='store')
     parser.add_argument('-a', '--action', action='store')
     parser.add_argument('--reset-on-set', action='store_true')
+    parser.add_argument('-j', '--jobs', action='store', type=int, default=1,
+                        help="Number of files updated in parallel")
+    parser.add_argument('--processes', action='store_true',
+                        help="Update files in parallel processes" +
+                             " instead of threads")
+    parser.add_argument('--atomic', action='store_true',
+                        help="Update all files in a single transaction")
+    parser.add_argument('--recover', action='store',
+                        choices=['rollback', 'replay'],
+                        help="Recovers an interrupted atomic update")
+    parser.add_argument('--import-version-file', action='store_true',
+                        help="Read the version file executing it" +
+                             " as a Python module")
     parser.add_argument('--verbose', action='store_true',
                         help="Be verbose")
     parser.add_argument('--version', action='store_true',
@@ -121,6 +146,27 @@ def main(original_args=None):
 
         sys.exit(0)
 
+    from punch import transaction as tr
+
+    if args.recover is not None:
+        if not os.path.exists(tr.JOURNAL_FILE_NAME):
+            fatal_error("There is no interrupted update to recover")
+
+        recovered_files = tr.Transaction.recover(
+            tr.JOURNAL_FILE_NAME,
+            replay=(args.recover == 'replay')
+        )
+        for filepath in recovered_files:
+            print("* Recovered file {}".format(filepath))
+
+        sys.exit(0)
+
+    if os.path.exists(tr.JOURNAL_FILE_NAME):
+        fatal_error(
+            "A previous atomic update was interrupted, run Punch" +
+            " with --recover rollback or --recover replay"
+        )
+
     if not any([args.part, args.set_part, args.action]):
         fatal_error("You must specify one of --part, --set-part, or --action")
 
@@ -134,8 +180,18 @@ def main(original_args=None):
     if args.verbose:
         print("## Punch version {}".format(punch.__version__))
 
+    from punch import config as cfr
+    from punch import file_updater as fu
+    from punch import replacer as rep
+    from punch import version as ver
+    from punch import version_file as vf
+
     try:
-        config = cfr.PunchConfig(args.config_file)
+        config_file = args.config_file
+        if config_file is None:
+            config_file = cfr.find_config_file()
+
+        config = cfr.PunchConfig(config_file, args.config_cache)
     except (cfr.ConfigurationVersionError, ValueError) as exc:
         fatal_error(
             "An error occurred while reading the configuration file.",
@@ -146,10 +202,13 @@ def main(original_args=None):
         if len(config.files) == 0:
             fatal_error("You didn't configure any file")
 
-    current_version = ver.Version.from_file(args.version_file, config.version)
+    current_version = ver.Version.from_file(
+        args.version_file, config.version, args.import_version_file)
     new_version = current_version.copy()
 
     if args.action:
+        from punch import action as act
+
         action_dict = config.actions[args.action]
         action = act.Action.from_dict(action_dict)
         new_version = action.process_version(new_version)
@@ -165,14 +224,18 @@ def main(original_args=None):
                 set_dict = dict(i.split('=') for i in args.set_part.split(','))
                 new_version.set(set_dict)
 
+    rendered_pairs = rep.RenderedPairs(
+        current_version.as_dict(),
+        new_version.as_dict()
+    )
+
     global_replacer = rep.Replacer(config.globals['serializer'])
     current_version_string, new_version_string = \
-        global_replacer.run_main_serializer(
-            current_version.as_dict(),
-            new_version.as_dict()
-        )
+        global_replacer.get_pairs(rendered_pairs)[0]
 
     if config.vcs is not None:
+        from punch import vcs_configuration as vcsc
+
         special_variables = {
             'current_version': current_version_string,
             'new_version': new_version_string
@@ -193,10 +256,7 @@ def main(original_args=None):
         print("\n* New version")
         show_version_parts(new_version.values)
 
-        changes = global_replacer.run_all_serializers(
-            current_version.as_dict(),
-            new_version.as_dict()
-        )
+        changes = global_replacer.get_pairs(rendered_pairs)
 
         print("\n* Global version updates")
         show_version_updates(changes)
@@ -205,10 +265,7 @@ def main(original_args=None):
         for file_configuration in config.files:
             updater = fu.FileUpdater(file_configuration)
             print("* {}: ".format(file_configuration.path))
-            changes = updater.get_summary(
-                current_version.as_dict(),
-                new_version.as_dict()
-            )
+            changes = updater.get_rendered_summary(rendered_pairs)
             show_version_updates(changes)
 
         if vcs_configuration is not None:
@@ -219,17 +276,14 @@ def main(original_args=None):
 
     else:
         if vcs_configuration is not None:
-            if vcs_configuration.name == 'git':
-                repo_class = gr.GitRepo
-            elif vcs_configuration.name == 'git-flow':
-                repo_class = gfr.GitFlowRepo
-            else:
-                fatal_error(
-                    "The requested version control" +
-                    " system {} is not supported.".format(
-                        vcs_configuration.name
-                    )
-                )
+            from punch.vcs_repositories import exceptions as rex
+            from punch.vcs_repositories import registry
+            from punch.vcs_use_cases import release as ruc
+
+            try:
+                repo_class = registry.repo_class(vcs_configuration.name)
+            except ValueError as exc:
+                fatal_error(str(exc))
 
             try:
                 repo = repo_class(os.getcwd(), vcs_configuration)
@@ -249,22 +303,59 @@ def main(original_args=None):
             uc.pre_start_release()
             uc.start_release()
 
-        for file_configuration in config.files:
+        if args.atomic:
+            transaction = tr.Transaction(tr.JOURNAL_FILE_NAME)
+        else:
+            transaction = None
+
+        unchanged_files = 0
+        changed_files = []
+        update_results = fu.update_files(
+            config.files,
+            rendered_pairs,
+            args.jobs,
+            args.processes,
+            staged=args.atomic
+        )
+        for result in update_results:
             if args.verbose:
-                print("* Updating file {}".format(file_configuration.path))
-            updater = fu.FileUpdater(file_configuration)
-            updater.update(current_version.as_dict(), new_version.as_dict())
+                print("* Updating file {}".format(result.path))
 
-        with open(args.version_file, 'w') as f:
-            if args.verbose:
-                print("* Updating version file")
+            if result.staged_path is not None:
+                transaction.add(result.path, result.staged_path)
+
+            if result.exception is not None:
+                if transaction is not None:
+                    for other_result in update_results:
+                        if other_result.staged_path is not None:
+                            transaction.add(
+                                other_result.path, other_result.staged_path)
+                    transaction.rollback()
+
+                fatal_error(
+                    "An error occurred while updating" +
+                    " the file {}".format(result.path),
+                    result.exception
+                )
+
+            if result.updated:
+                changed_files.append(result.path)
+            else:
+                unchanged_files += 1
 
-            for i in new_version.keys:
-                f.write('{name} = {value}\n'.format(
-                    name=new_version.parts[i].name,
-                    value=new_version.parts[i].value
-                ))
+        if args.verbose:
+            print("* {} file(s) unchanged, not rewritten".format(
+                unchanged_files))
+            print("* Updating version file")
+
+        if transaction is not None:
+            transaction.stage(
+                args.version_file, vf.render(new_version))
+            transaction.commit()
+        else:
+            vf.write(args.version_file, new_version)
 
         if vcs_configuration is not None:
-            uc.finish_release()
+            uc.finish_release(changed_files + [args.version_file])
             uc.post_finish_release()
+            uc.close()
@@ -1,66 +1,320 @@
 import collections
+import hashlib
+import io
+import json
+import os
+import sys
+
+from six.moves import cPickle as pickle
+
+import punch
 from punch import file_configuration as fc
-from punch.helpers import import_file
+from punch import file_index as fi
+from punch.helpers import import_file, replace_file, temp_filepath_for
 
 
 class ConfigurationVersionError(Exception):
     "An exception used to signal that the configuration file version is wrong"
 
 
+DEFAULT_CONFIG_FILES = [
+    'punch_config.py',
+    'punch.toml',
+    'punch.json',
+    'pyproject.toml',
+]
+
+# Names of the variables of a Python config file for each key of a
+# declarative one
+DECLARATIVE_KEYS = {
+    'config_version': '__config_version__',
+    'globals': 'GLOBALS',
+    'files': 'FILES',
+    'files_ignore': 'FILES_IGNORE',
+    'files_index_cache': 'FILES_INDEX_CACHE',
+    'version': 'VERSION',
+    'vcs': 'VCS',
+    'actions': 'ACTIONS',
+    'dependencies': 'DEPENDENCIES',
+}
+
+
+def _load_toml(config_filepath):
+    try:
+        import tomllib as toml_module
+    except ImportError:
+        try:
+            import tomli as toml_module
+        except ImportError:
+            toml_module = None
+
+    if toml_module is not None:
+        with io.open(config_filepath, 'rb') as f:
+            return toml_module.load(f)
+
+    try:
+        import toml
+    except ImportError:
+        raise ValueError(
+            "Reading the config file {} requires".format(config_filepath) +
+            " Python 3.11 or the toml package")
+
+    with io.open(config_filepath, 'r', encoding='utf8') as f:
+        return toml.load(f)
+
+
+def _load_json(config_filepath):
+    with io.open(config_filepath, 'r', encoding='utf8') as f:
+        return json.load(f)
+
+
+def _is_pyproject(config_filepath):
+    return os.path.basename(config_filepath) == 'pyproject.toml'
+
+
+def load_variables(config_filepath):
+    "The variables of a config file, named as in a Python config file"
+    if not config_filepath.endswith(('.toml', '.json')):
+        return vars(import_file(config_filepath))
+
+    if not os.path.exists(config_filepath):
+        raise ValueError(
+            "The config file {} cannot be found.".format(config_filepath))
+
+    try:
+        if config_filepath.endswith('.toml'):
+            data = _load_toml(config_filepath)
+        else:
+            data = _load_json(config_filepath)
+    except ValueError as exc:
+        # The TOML parsers raise subclasses of ValueError
+        raise ValueError(
+            "The config file {} cannot be parsed: {}".format(
+                config_filepath, exc))
+
+    if _is_pyproject(config_filepath):
+        data = data.get('tool', {}).get('punch', {})
+
+    return dict(
+        (DECLARATIVE_KEYS.get(key, key), value)
+        for key, value in data.items()
+    )
+
+
+def _has_punch_section(pyproject_filepath):
+    try:
+        return 'punch' in _load_toml(pyproject_filepath).get('tool', {})
+    except ValueError:
+        return False
+
+
+def find_config_file(directory=os.curdir):
+    """The first config file found in the directory.
+
+    A pyproject.toml file is used only when it has a [tool.punch]
+    section.
+    """
+    for name in DEFAULT_CONFIG_FILES:
+        config_filepath = os.path.join(directory, name)
+        if not os.path.exists(config_filepath):
+            continue
+
+        if _is_pyproject(config_filepath) and \
+                not _has_punch_section(config_filepath):
+            continue
+
+        return config_filepath
+
+    return os.path.join(directory, DEFAULT_CONFIG_FILES[0])
+
+
+def cache_key(config_filepath):
+    # Cached configurations are not valid across Punch or Python versions
+    digest = hashlib.sha256()
+    digest.update(punch.__version__.encode('utf8'))
+    digest.update('{}.{}'.format(*sys.version_info[:2]).encode('utf8'))
+
+    with io.open(config_filepath, 'rb') as f:
+        digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def _load_cache(cache_path, key):
+    try:
+        with io.open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(cached, dict) or cached.get('key') != key:
+        return None
+
+    return cached['state']
+
+
+def _save_cache(cache_path, key, state):
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir and not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    # Concurrent runs shall never read a partially written cache
+    temp_path = temp_filepath_for(cache_path)
+    try:
+        with io.open(temp_path, 'wb') as f:
+            pickle.dump({'key': key, 'state': state}, f,
+                        pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # Configurations with values that cannot be pickled are not cached
+        os.remove(temp_path)
+        return
+
+    replace_file(temp_path, cache_path)
+
+
 class PunchConfig(object):
 
-    def __init__(self, config_filepath):
+    def __init__(self, config_filepath, cache_path=None, root=None):
+        # Paths of the managed files are relative to the root, which is
+        # the working directory unless given
+        self.root = root
+        state = None
+
+        if cache_path is not None:
+            key = cache_key(config_filepath)
+            state = _load_cache(cache_path, key)
+
+        if state is None:
+            state = self._read(config_filepath)
 
-        configuration_module = import_file(config_filepath)
+            if cache_path is not None:
+                _save_cache(cache_path, key, state)
+
+        self.__config_version__ = state['config_version']
+        self.globals = state['globals']
+        self.version = state['version']
+        self.vcs = state['vcs']
+        self.actions = state['actions']
+        self.dependencies = state['dependencies']
+
+        self.files = self._expand_patterns(
+            state['files'], state['files_ignore'], state['files_index_cache'])
+
+    def _read(self, config_filepath):
+        variables = load_variables(config_filepath)
+        state = {}
 
         try:
-            self.__config_version__ = configuration_module.__config_version__
-        except AttributeError:
+            state['config_version'] = variables['__config_version__']
+        except KeyError:
             raise ValueError(
                 "Given config file is invalid:" +
                 " missing '__config_version__' variable"
             )
 
-        if configuration_module.__config_version__ > 1:
+        if state['config_version'] > 1:
             raise ConfigurationVersionError(
                 "Unsupported configuration file version" +
-                " {}".format(configuration_module.__config_version__)
+                " {}".format(state['config_version'])
             )
 
-        try:
-            self.globals = configuration_module.GLOBALS
-        except AttributeError:
-            self.globals = {}
+        state['globals'] = variables.get('GLOBALS', {})
 
         try:
-            files = configuration_module.FILES
-        except AttributeError:
+            files = variables['FILES']
+        except KeyError:
             raise ValueError(
                 "Given config file is invalid: missing 'FILES' attribute")
 
-        self.files = []
+        state['files_ignore'] = variables.get('FILES_IGNORE', [])
+        state['files_index_cache'] = variables.get('FILES_INDEX_CACHE')
+
+        # Patterns are expanded each time, as they depend on the files
+        # in the working directory and not on the configuration
+        state['files'] = []
         for file_configuration in files:
             if isinstance(file_configuration, collections.Mapping):
-                self.files.append(fc.FileConfiguration.from_dict(
-                    file_configuration, self.globals))
+                path = file_configuration['path']
+                local_variables = file_configuration
+            else:
+                path = file_configuration
+                local_variables = {}
+
+            if fi.is_pattern(path):
+                state['files'].append((path, local_variables))
             else:
-                self.files.append(fc.FileConfiguration(
-                    file_configuration, {}, self.globals))
+                state['files'].append(self._file_configuration(
+                    path, local_variables, state['globals']))
 
         try:
-            self.version = configuration_module.VERSION
-        except AttributeError:
+            state['version'] = variables['VERSION']
+        except KeyError:
             raise ValueError(
                 "Given config file is invalid: missing 'VERSION' attribute")
 
-        try:
-            self.vcs = configuration_module.VCS
-            if 'name' not in self.vcs.keys():
-                raise ValueError("Missing key 'name' in VCS configuration")
-        except AttributeError:
-            self.vcs = None
+        state['vcs'] = variables.get('VCS')
+        if state['vcs'] is not None and 'name' not in state['vcs'].keys():
+            raise ValueError("Missing key 'name' in VCS configuration")
 
-        try:
-            self.actions = configuration_module.ACTIONS
-        except AttributeError:
-            self.actions = {}
+        state['actions'] = variables.get('ACTIONS', {})
+
+        # Other packages of a workspace this one depends on
+        state['dependencies'] = variables.get('DEPENDENCIES', [])
+
+        return state
+
+    def _file_configuration(self, path, local_variables, global_variables):
+        if local_variables:
+            return fc.FileConfiguration.from_dict(
+                dict(local_variables, path=path), global_variables)
+
+        return fc.FileConfiguration(path, {}, global_variables)
+
+    def _expand_patterns(self, files, files_ignore, files_index_cache):
+        file_index = None
+
+        expanded_files = []
+        for file_configuration in files:
+            if isinstance(file_configuration, fc.FileConfiguration):
+                if self.root is not None:
+                    file_configuration.path = os.path.join(
+                        self.root, file_configuration.path)
+                expanded_files.append(file_configuration)
+                continue
+
+            pattern, local_variables = file_configuration
+
+            # Existing files are used literally, as their names may
+            # contain glob characters, like app/[slug]/version.ts
+            path = pattern
+            if self.root is not None:
+                path = os.path.join(self.root, pattern)
+
+            if os.path.exists(path):
+                expanded_files.append(self._file_configuration(
+                    path, local_variables, self.globals))
+                continue
+
+            if file_index is None:
+                if self.root is not None and files_index_cache is not None:
+                    files_index_cache = os.path.join(
+                        self.root, files_index_cache)
+                file_index = fi.FileIndex(
+                    self.root or os.curdir, files_ignore, files_index_cache)
+
+            paths = file_index.expand(pattern)
+            if not paths:
+                raise ValueError(
+                    "The pattern {} in FILES does not match any file".format(
+                        pattern))
+
+            for path in paths:
+                if self.root is not None:
+                    path = os.path.join(self.root, path)
+                expanded_files.append(self._file_configuration(
+                    path, local_variables, self.globals))
+
+        if file_index is not None:
+            file_index.save()
+
+        return expanded_files
@@ -1,5 +1,6 @@
 import six
-import jinja2
+
+from punch import templates
 
 
 class FileConfiguration(object):
@@ -8,15 +9,21 @@ class FileConfiguration(object):
         if global_variables:
             self.config.update(global_variables)
 
+        global_fingerprint = templates.fingerprint(global_variables)
+
         new_local_variables = {}
-        env = jinja2.Environment(undefined=jinja2.DebugUndefined)
         for key, value in local_variables.items():
-            if six.PY2:
+            # Only strings are templates, numbers like streaming_threshold
+            # are kept as they are
+            if not isinstance(value, six.string_types):
+                new_local_variables[key] = value
+                continue
+
+            if six.PY2 and isinstance(value, bytes):
                 value = value.decode('utf8')
 
-            template = env.from_string(value)
-            new_local_variables[key] = template.render(
-                GLOBALS=global_variables)
+            new_local_variables[key] = templates.render_config_value(
+                value, global_variables, global_fingerprint)
 
         self.config.update(new_local_variables)
         self.path = filepath
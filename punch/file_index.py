@@ -0,0 +1,220 @@
+import io
+import json
+import os
+import re
+import time
+
+import six
+
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover
+    scandir = None
+
+# Directories never walked when expanding patterns
+DEFAULT_IGNORE = ['.git', '.hg', '.svn', '.tox', '__pycache__']
+
+GLOB_CHARACTERS = set('*?[')
+
+# Directories modified less than this number of seconds before they were
+# scanned may change again without changing their mtime
+MTIME_RESOLUTION = 2
+
+
+def is_pattern(path):
+    return any(c in GLOB_CHARACTERS for c in path)
+
+
+def _translate_segment(segment):
+    i = 0
+    regex = ''
+    while i < len(segment):
+        c = segment[i]
+        i += 1
+
+        if c == '*':
+            regex += '[^/]*'
+        elif c == '?':
+            regex += '[^/]'
+        elif c == '[':
+            j = segment.find(']', i + 1)
+            if j == -1:
+                regex += re.escape(c)
+            else:
+                chars = segment[i:j].replace('\\', '\\\\')
+                if chars.startswith('!'):
+                    chars = '^' + chars[1:]
+                regex += '[' + chars + ']'
+                i = j + 1
+        else:
+            regex += re.escape(c)
+
+    return regex
+
+
+def compile_pattern(pattern):
+    segments = pattern.replace(os.sep, '/').strip('/').split('/')
+
+    regex = ''
+    for segment in segments[:-1]:
+        if segment == '**':
+            regex += '(?:[^/]+/)*'
+        else:
+            regex += _translate_segment(segment) + '/'
+
+    if segments[-1] == '**':
+        regex += '.*'
+    else:
+        regex += _translate_segment(segments[-1])
+
+    return re.compile(regex + r'\Z')
+
+
+def _literal_prefix(pattern):
+    segments = pattern.replace(os.sep, '/').strip('/').split('/')
+
+    prefix = []
+    for segment in segments[:-1]:
+        if is_pattern(segment):
+            break
+        prefix.append(segment)
+
+    return '/'.join(prefix)
+
+
+def _max_depth(pattern):
+    segments = pattern.replace(os.sep, '/').strip('/').split('/')
+    if '**' in segments:
+        return None
+
+    return len(segments)
+
+
+class FileIndex(object):
+
+    def __init__(self, root=os.curdir, ignore=None, cache_path=None):
+        self.root = root
+        self.cache_path = cache_path
+
+        self._ignore_names = []
+        self._ignore_paths = []
+        for rule in DEFAULT_IGNORE + list(ignore or []):
+            if '/' in rule.strip('/'):
+                self._ignore_paths.append(compile_pattern(rule))
+            else:
+                self._ignore_names.append(compile_pattern(rule))
+
+        self._directories = {}
+        self._dirty = False
+        self._load_cache()
+
+    def _load_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with io.open(self.cache_path, 'r') as f:
+                self._directories = json.load(f)['directories']
+        except (ValueError, KeyError, IOError, OSError):
+            self._directories = {}
+
+    def save(self):
+        if self.cache_path is None or not self._dirty:
+            return
+
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        with io.open(self.cache_path, 'w') as f:
+            f.write(six.text_type(json.dumps(
+                {'directories': self._directories})))
+
+        self._dirty = False
+
+    def is_ignored(self, relpath, is_dir=False):
+        name = relpath.rsplit('/', 1)[-1]
+
+        if any(r.match(name) for r in self._ignore_names):
+            return True
+
+        # The trailing slash makes rules like 'build/**' match the
+        # directory itself, which is then not walked at all
+        if is_dir:
+            relpath = relpath + '/'
+
+        return any(r.match(relpath) for r in self._ignore_paths)
+
+    def _scan(self, fullpath):
+        files = []
+        dirs = []
+
+        if scandir is not None:
+            for entry in scandir(fullpath):
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    files.append(entry.name)
+        else:
+            for name in os.listdir(fullpath):
+                if os.path.isdir(os.path.join(fullpath, name)):
+                    dirs.append(name)
+                else:
+                    files.append(name)
+
+        return sorted(files), sorted(dirs)
+
+    def listdir(self, relpath):
+        fullpath = os.path.join(self.root, relpath) if relpath else self.root
+        mtime = os.stat(fullpath).st_mtime
+
+        cached = self._directories.get(relpath)
+        if cached is not None and cached['mtime'] == mtime and \
+                mtime < cached['scanned'] - MTIME_RESOLUTION:
+            return cached['files'], cached['dirs']
+
+        files, dirs = self._scan(fullpath)
+        self._directories[relpath] = {
+            'mtime': mtime,
+            'scanned': time.time(),
+            'files': files,
+            'dirs': dirs
+        }
+        self._dirty = True
+
+        return files, dirs
+
+    def walk(self, start='', max_depth=None):
+        start_path = os.path.join(self.root, start) if start else self.root
+        if not os.path.isdir(start_path):
+            return
+
+        stack = [(start, 0)]
+        while stack:
+            relpath, depth = stack.pop()
+            files, dirs = self.listdir(relpath)
+
+            for name in files:
+                filepath = relpath + '/' + name if relpath else name
+                if not self.is_ignored(filepath):
+                    yield filepath
+
+            if max_depth is not None and depth + 1 >= max_depth:
+                continue
+
+            for name in reversed(dirs):
+                dirpath = relpath + '/' + name if relpath else name
+                if not self.is_ignored(dirpath, is_dir=True):
+                    stack.append((dirpath, depth + 1))
+
+    def expand(self, pattern):
+        regex = compile_pattern(pattern)
+        prefix = _literal_prefix(pattern)
+
+        max_depth = _max_depth(pattern)
+        if max_depth is not None and prefix:
+            max_depth -= len(prefix.split('/'))
+
+        return sorted(
+            p for p in self.walk(prefix, max_depth) if regex.match(p)
+        )
@@ -1,19 +1,91 @@
+import collections
+import copy
+import io
+import locale
+import mmap
 import os
+import re
+import shutil
+
 import six
 
 from punch import replacer
+from punch.helpers import replace_file, temp_filepath_for
+
+# Files bigger than this (in bytes) are processed in chunks
+DEFAULT_STREAMING_THRESHOLD = 16 * 1024 * 1024
+
+UpdateResult = collections.namedtuple(
+    'UpdateResult', ['path', 'updated', 'exception', 'staged_path'])
+
+
+def _open_text(filepath, mode):
+    if six.PY2:
+        return io.open(filepath, mode, encoding='utf8')
+    else:
+        return io.open(filepath, mode)
+
+
+def _file_encoding():
+    if six.PY2:
+        return 'utf8'
+    else:
+        return locale.getpreferredencoding(False)
+
+
+def file_contains_any(filepath, search_patterns):
+    # Text mode translates newlines, so patterns containing them cannot
+    # be searched as raw bytes
+    if any('\n' in p or '\r' in p for p in search_patterns):
+        return True
+
+    try:
+        encoding = _file_encoding()
+        byte_patterns = [p.encode(encoding) for p in search_patterns]
+    except (LookupError, UnicodeError):
+        return True
+
+    if len(byte_patterns) == 0 or os.path.getsize(filepath) == 0:
+        return False
+
+    regex = re.compile(b'|'.join(re.escape(p) for p in byte_patterns))
+
+    with open(filepath, 'rb') as f:
+        mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return regex.search(mapped_file) is not None
+        finally:
+            mapped_file.close()
 
 
 class FileUpdater(object):
 
     def __init__(self, file_configuration):
         self.file_configuration = file_configuration
-        self.rep = replacer.Replacer(file_configuration.config['serializer'])
+        self.rep = replacer.Replacer(
+            file_configuration.config['serializer'],
+            file_configuration.config.get(
+                'conflict_policy', replacer.DEFAULT_CONFLICT_POLICY)
+        )
+        self.streaming_threshold = int(file_configuration.config.get(
+            'streaming_threshold', DEFAULT_STREAMING_THRESHOLD))
+
+        # When updates are staged the new content is written in this
+        # file instead of replacing the configured one
+        self.staged_filepath = None
 
     def get_summary(self, current_version, new_version):
         return self.rep.run_all_serializers(current_version, new_version)
 
+    def get_rendered_summary(self, rendered_pairs):
+        return self.rep.get_pairs(rendered_pairs)
+
     def update(self, current_version, new_version):
+        return self.update_rendered(
+            replacer.RenderedPairs(current_version, new_version)
+        )
+
+    def update_rendered(self, rendered_pairs, staged=False):
         if not os.path.exists(self.file_configuration.path):
             if six.PY2:
                 raise IOError(
@@ -28,17 +100,156 @@ class FileUpdater(object):
                     )
                 )
 
+        multi_replacer = self.rep.get_multi_replacer(rendered_pairs)
+        if not file_contains_any(
+                self.file_configuration.path,
+                list(multi_replacer.replacements.keys())):
+            return False
+
+        file_size = os.path.getsize(self.file_configuration.path)
+        if file_size > self.streaming_threshold:
+            return self.update_rendered_stream(rendered_pairs, staged=staged)
+
         with open(self.file_configuration.path, 'r') as f:
             old_file_content = f.read()
 
-        new_file_content = self.rep.replace(
+        new_file_content = self.rep.replace_rendered(
             old_file_content,
-            current_version,
-            new_version
+            rendered_pairs
         )
 
         if six.PY2:
             new_file_content = new_file_content.encode('utf8')
 
-        with open(self.file_configuration.path, 'w') as f:
-            f.write(new_file_content)
+        if new_file_content == old_file_content:
+            return False
+
+        if staged:
+            self.staged_filepath = temp_filepath_for(
+                self.file_configuration.path)
+            with open(self.staged_filepath, 'w') as f:
+                f.write(new_file_content)
+            shutil.copymode(self.file_configuration.path, self.staged_filepath)
+        else:
+            with open(self.file_configuration.path, 'w') as f:
+                f.write(new_file_content)
+
+        return True
+
+    def update_rendered_stream(self, rendered_pairs,
+                               chunk_size=replacer.DEFAULT_CHUNK_SIZE,
+                               staged=False):
+        filepath = self.file_configuration.path
+        temp_filepath = temp_filepath_for(filepath)
+
+        try:
+            with _open_text(filepath, 'r') as source, \
+                    _open_text(temp_filepath, 'w') as destination:
+                replacements_count = self.rep.replace_rendered_stream(
+                    source,
+                    destination,
+                    rendered_pairs,
+                    chunk_size
+                )
+
+            if replacements_count == 0:
+                os.remove(temp_filepath)
+                return False
+
+            shutil.copymode(filepath, temp_filepath)
+            if staged:
+                self.staged_filepath = temp_filepath
+            else:
+                replace_file(temp_filepath, filepath)
+        except Exception:
+            os.remove(temp_filepath)
+            raise
+
+        return True
+
+
+def _update_file(args):
+    file_configuration, rendered_pairs, staged = args
+
+    try:
+        updater = FileUpdater(file_configuration)
+        updated = updater.update_rendered(rendered_pairs, staged=staged)
+    except Exception as exc:
+        return UpdateResult(file_configuration.path, False, exc, None)
+
+    return UpdateResult(
+        file_configuration.path, updated, None, updater.staged_filepath)
+
+
+def _update_group(args):
+    entries, rendered_pairs, staged = args
+
+    results = []
+    staged_path = None
+    for index, file_configuration in entries:
+        if staged_path is None:
+            result = _update_file(
+                (file_configuration, rendered_pairs, staged))
+            if staged:
+                staged_path = result.staged_path
+        else:
+            # The file is already staged, later entries change the staged
+            # content that is then committed once
+            staged_configuration = copy.copy(file_configuration)
+            staged_configuration.path = staged_path
+            result = _update_file(
+                (staged_configuration, rendered_pairs, False))
+            result = result._replace(path=file_configuration.path)
+
+        results.append((index, result))
+
+    return results
+
+
+def _group_by_path(file_configurations):
+    # Entries for the same file are run one after the other in a single
+    # task, so each one sees the changes of the previous ones
+    groups = collections.OrderedDict()
+    for index, file_configuration in enumerate(file_configurations):
+        key = os.path.normcase(os.path.abspath(file_configuration.path))
+        groups.setdefault(key, []).append((index, file_configuration))
+
+    return list(groups.values())
+
+
+def _in_order(group_results):
+    pending = {}
+    next_index = 0
+
+    for results in group_results:
+        pending.update(results)
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+
+def update_files(file_configurations, rendered_pairs, jobs=1,
+                 use_processes=False, staged=False):
+    tasks = [(group, rendered_pairs, staged)
+             for group in _group_by_path(file_configurations)]
+
+    if jobs <= 1:
+        for result in _in_order(_update_group(task) for task in tasks):
+            yield result
+        return
+
+    import multiprocessing.pool
+
+    if use_processes:
+        pool = multiprocessing.Pool(jobs)
+    else:
+        pool = multiprocessing.pool.ThreadPool(jobs)
+
+    try:
+        # Results are reported in the order of the file configurations,
+        # whatever the order in which the workers complete them
+        for result in _in_order(pool.imap(_update_group, tasks)):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
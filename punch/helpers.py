@@ -1,4 +1,8 @@
+import os
 import sys
+import tempfile
+
+TEMP_FILE_PREFIX = '.punch-'
 
 
 def import_file(filepath):
@@ -28,3 +32,22 @@ def import_file(filepath):
         spec.loader.exec_module(module)
 
     return module
+
+
+def temp_filepath_for(filepath):
+    # The temporary file lives in the same directory of the final one,
+    # so that it can be renamed atomically
+    fd, temp_filepath = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filepath)),
+        prefix=TEMP_FILE_PREFIX,
+    )
+    os.close(fd)
+
+    return temp_filepath
+
+
+def replace_file(source, destination):
+    if sys.version_info < (3, 3):
+        os.rename(source, destination)
+    else:
+        os.replace(source, destination)
@@ -1,27 +1,218 @@
+import re
 import six
 import collections
-from jinja2 import Template
+
+from punch import templates
+
+CONFLICT_POLICIES = ('first', 'longest')
+DEFAULT_CONFLICT_POLICY = 'first'
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _overlap(a, b):
+    "Whether an occurrence of a and one of b can share some text"
+    if a in b or b in a:
+        return True
+
+    return any(a.endswith(b[:k]) or b.endswith(a[:k])
+               for k in range(1, min(len(a), len(b))))
+
+
+def _independent(pairs):
+    # A pattern that can match across an earlier pattern or across the
+    # text replacing it is affected by the order of the replacements
+    for i, (search_pattern, replace_pattern) in enumerate(pairs):
+        for later_search_pattern, _ in pairs[i + 1:]:
+            if _overlap(search_pattern, later_search_pattern) or \
+                    _overlap(replace_pattern, later_search_pattern):
+                return False
+
+    return True
+
+
+def _read_chunks(source, chunk_size):
+    chunk = source.read(chunk_size)
+    while chunk:
+        yield chunk
+        chunk = source.read(chunk_size)
+
+
+def _replace_chunks(chunks, regex, substitute, max_pattern_length, counter):
+    carry = ''
+
+    for chunk in chunks:
+        buffer = carry + chunk
+
+        # A match is safe only if the buffer holds enough text to check
+        # every pattern at its position. The tail is carried over to the
+        # next chunk.
+        boundary = len(buffer) - max_pattern_length + 1
+
+        pieces = []
+        position = 0
+        for match in regex.finditer(buffer):
+            if match.start() >= boundary:
+                break
+
+            pieces.append(buffer[position:match.start()])
+            pieces.append(substitute(match))
+            position = match.end()
+            counter[0] += 1
+
+        if position < boundary:
+            pieces.append(buffer[position:boundary])
+            position = boundary
+
+        carry = buffer[position:]
+        yield ''.join(pieces)
+
+    new_carry, count = regex.subn(substitute, carry)
+    counter[0] += count
+    yield new_carry
+
+
+class MultiReplacer(object):
+    """Replaces all the search patterns in a single scan of the text.
+
+    With the 'first' policy patterns that may overlap each other or the
+    replaced text are replaced one after the other instead, in the order
+    of the serializers, which is what a sequence of str.replace does.
+    """
+
+    def __init__(self, pairs, conflict_policy=DEFAULT_CONFLICT_POLICY):
+        if conflict_policy not in CONFLICT_POLICIES:
+            raise ValueError(
+                "Unknown conflict policy {}, allowed values are {}".format(
+                    conflict_policy, ", ".join(CONFLICT_POLICIES)))
+
+        self.conflict_policy = conflict_policy
+
+        # Empty and unchanged patterns cannot produce any change
+        self.pairs = [
+            (search_pattern, replace_pattern)
+            for search_pattern, replace_pattern in pairs
+            if search_pattern != '' and search_pattern != replace_pattern
+        ]
+
+        # Repeated patterns are already handled by their first occurrence
+        self.replacements = collections.OrderedDict()
+        for search_pattern, replace_pattern in self.pairs:
+            self.replacements.setdefault(search_pattern, replace_pattern)
+
+        self.sequential = conflict_policy == 'first' and \
+            not _independent(self.pairs)
+
+        search_patterns = list(self.replacements.keys())
+        if conflict_policy == 'longest':
+            search_patterns.sort(key=len, reverse=True)
+
+        # Alternatives are tried in order, so when two patterns match at
+        # the same position the one listed first wins
+        self._regex = re.compile(
+            '|'.join(re.escape(p) for p in search_patterns))
+
+        self.max_pattern_length = max(
+            [len(p) for p in search_patterns] or [0])
+
+    def _substitute(self, match):
+        return self.replacements[match.group(0)]
+
+    def replace(self, text):
+        if len(self.replacements) == 0:
+            return text
+
+        if self.sequential or len(self.replacements) == 1:
+            for search_pattern, replace_pattern in self.pairs:
+                text = text.replace(search_pattern, replace_pattern)
+            return text
+
+        return self._regex.sub(self._substitute, text)
+
+    def replace_stream(self, source, destination,
+                       chunk_size=DEFAULT_CHUNK_SIZE):
+        chunk_size = max(chunk_size, self.max_pattern_length)
+        chunks = _read_chunks(source, chunk_size)
+        counter = [0]
+
+        if self.sequential:
+            # Each pass reads the output of the previous one
+            for search_pattern, replace_pattern in self.pairs:
+                chunks = _replace_chunks(
+                    chunks,
+                    re.compile(re.escape(search_pattern)),
+                    lambda match, r=replace_pattern: r,
+                    len(search_pattern),
+                    counter
+                )
+        elif len(self.replacements) > 0:
+            chunks = _replace_chunks(
+                chunks, self._regex, self._substitute,
+                self.max_pattern_length, counter)
+
+        for chunk in chunks:
+            destination.write(chunk)
+
+        return counter[0]
+
+
+class RenderedPairs(object):
+    "Renders each serializer once for a given pair of versions"
+
+    def __init__(self, current_version_dict, new_version_dict):
+        self.current_version = current_version_dict
+        self.new_version = new_version_dict
+        self._pairs = {}
+        self._multi_replacers = {}
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def get(self, serializer):
+        try:
+            return self._pairs[serializer]
+        except KeyError:
+            template = templates.get_template(serializer)
+            pair = (
+                template.render(**self.current_version),
+                template.render(**self.new_version)
+            )
+            self._pairs[serializer] = pair
+
+            return pair
+
+    def get_multi_replacer(self, serializers, conflict_policy):
+        key = (tuple(serializers), conflict_policy)
+
+        try:
+            return self._multi_replacers[key]
+        except KeyError:
+            multi_replacer = MultiReplacer(
+                [self.get(s) for s in serializers],
+                conflict_policy
+            )
+            self._multi_replacers[key] = multi_replacer
+
+            return multi_replacer
 
 
 class Replacer:
-    def __init__(self, serializers):
+    def __init__(self, serializers,
+                 conflict_policy=DEFAULT_CONFLICT_POLICY):
+        self.conflict_policy = conflict_policy
 
         if isinstance(serializers, collections.MutableSequence):
             self.serializers = serializers
         else:
             self.serializers = [serializers]
 
-    def run_all_serializers(self, current_version_dict, new_version_dict):
-        summary = []
-        for serializer in self.serializers:
-            template = Template(serializer)
+    def get_pairs(self, rendered_pairs):
+        return [rendered_pairs.get(s) for s in self.serializers]
 
-            summary.append((
-                template.render(**current_version_dict),
-                template.render(**new_version_dict)
-            ))
-
-        return summary
+    def run_all_serializers(self, current_version_dict, new_version_dict):
+        return self.get_pairs(
+            RenderedPairs(current_version_dict, new_version_dict)
+        )
 
     def run_main_serializer(self, current_version_dict, new_version_dict):
         return self.run_all_serializers(
@@ -30,16 +221,27 @@ class Replacer:
         )[0]
 
     def replace(self, text, current_version, new_version):
-        if six.PY2:
-            text = text.decode('utf8')
+        return self.replace_rendered(
+            text,
+            RenderedPairs(current_version, new_version)
+        )
 
-        new_text = text
-        for serializer in self.serializers:
-            template = Template(serializer)
+    def get_multi_replacer(self, rendered_pairs):
+        return rendered_pairs.get_multi_replacer(
+            self.serializers,
+            self.conflict_policy
+        )
 
-            _search_pattern = template.render(**current_version)
-            _replace_pattern = template.render(**new_version)
+    def replace_rendered(self, text, rendered_pairs):
+        if six.PY2:
+            text = text.decode('utf8')
 
-            new_text = new_text.replace(_search_pattern, _replace_pattern)
+        return self.get_multi_replacer(rendered_pairs).replace(text)
 
-        return new_text
+    def replace_rendered_stream(self, source, destination, rendered_pairs,
+                                chunk_size=DEFAULT_CHUNK_SIZE):
+        return self.get_multi_replacer(rendered_pairs).replace_stream(
+            source,
+            destination,
+            chunk_size
+        )
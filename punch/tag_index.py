@@ -0,0 +1,72 @@
+import bisect
+import collections
+
+from punch import version as ver
+
+Tag = collections.namedtuple('Tag', ['name', 'revision', 'version'])
+
+
+class TagIndex(object):
+    """The tags of a repository that are versions, sorted by version.
+
+    Tags that cannot be parsed with the serializer are left out.
+    """
+
+    def __init__(self, tags, parser):
+        entries = []
+        for name, revision in tags:
+            version = parser.parse(name)
+            if version is not None:
+                entries.append((version.sort_key, name, revision, version))
+
+        entries.sort(key=lambda e: (e[0], e[1]))
+
+        self._keys = [e[0] for e in entries]
+        self.tags = [Tag(name, revision, version)
+                     for key, name, revision, version in entries]
+
+    @classmethod
+    def from_repo(cls, repo, version, serializer):
+        return cls(repo.list_tags(), ver.VersionParser(version, serializer))
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __iter__(self):
+        return iter(self.tags)
+
+    def latest(self):
+        if not self.tags:
+            return None
+
+        return self.tags[-1]
+
+    def previous(self, version):
+        "The most recent tag of a version lower than the given one"
+        idx = bisect.bisect_left(self._keys, version.sort_key)
+        if idx == 0:
+            return None
+
+        return self.tags[idx - 1]
+
+    def find(self, version):
+        key = version.sort_key
+        idx = bisect.bisect_left(self._keys, key)
+        if idx == len(self._keys) or self._keys[idx] != key:
+            return None
+
+        return self.tags[idx]
+
+    def range(self, start=None, stop=None):
+        "The tags of the versions from start included to stop excluded"
+        if start is None:
+            first = 0
+        else:
+            first = bisect.bisect_left(self._keys, start.sort_key)
+
+        if stop is None:
+            last = len(self._keys)
+        else:
+            last = bisect.bisect_left(self._keys, stop.sort_key)
+
+        return self.tags[first:last]
@@ -0,0 +1,206 @@
+import collections
+import re
+import threading
+
+import six
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_RENDER_CACHE_SIZE = 4096
+
+SIMPLE_VARIABLE = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+
+# Names that Jinja2 resolves to literals or globals
+RESERVED_NAMES = {
+    'true', 'false', 'none', 'True', 'False', 'None',
+    'range', 'dict', 'lipsum', 'cycler', 'joiner', 'namespace', 'self'
+}
+
+
+class SimpleTemplate(object):
+    "Renders templates made only of text and {{ variable }} substitutions"
+
+    def __init__(self, literals, names):
+        self.literals = literals
+        self.names = names
+
+    @classmethod
+    def from_source(cls, source):
+        literals = []
+        names = []
+
+        position = 0
+        for match in SIMPLE_VARIABLE.finditer(source):
+            literals.append(source[position:match.start()])
+            names.append(match.group(1))
+            position = match.end()
+        literals.append(source[position:])
+
+        if any(n in RESERVED_NAMES for n in names):
+            return None
+
+        # Filters, statements, comments and whitespace control markers
+        # all need the full Jinja2 machinery
+        for literal in literals:
+            if '{{' in literal or '{%' in literal or '{#' in literal:
+                return None
+
+        # Something like {{{x}}} is not a plain substitution either
+        if any(literal.endswith('{') for literal in literals[:-1]):
+            return None
+
+        # Jinja2 normalises newlines and removes a single trailing one
+        literals = [literal.replace('\r\n', '\n').replace('\r', '\n')
+                    for literal in literals]
+        if literals[-1].endswith('\n'):
+            literals[-1] = literals[-1][:-1]
+
+        return cls(literals, names)
+
+    def render(self, *args, **kwargs):
+        context = dict(*args, **kwargs)
+
+        parts = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            if name in context:
+                parts.append(six.text_type(context[name]))
+            parts.append(literal)
+
+        return ''.join(parts)
+
+
+class TemplateCache(object):
+
+    def __init__(self, environment=None, maxsize=DEFAULT_CACHE_SIZE,
+                 environment_factory=None, fast_path=False):
+        self.fast_path = fast_path
+        self._environment = environment
+        self._environment_factory = environment_factory
+        self.maxsize = maxsize
+        self._templates = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def environment(self):
+        # The environment may be created on first use, so that jinja2 is
+        # imported only when a template is actually compiled
+        if self._environment is None:
+            self._environment = self._environment_factory()
+
+        return self._environment
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __contains__(self, source):
+        return source in self._templates
+
+    def get(self, source):
+        with self._lock:
+            try:
+                template = self._templates.pop(source)
+            except KeyError:
+                template = None
+                if self.fast_path:
+                    template = SimpleTemplate.from_source(source)
+
+                if template is None:
+                    template = self.environment.from_string(source)
+
+                if len(self._templates) >= self.maxsize:
+                    self._templates.popitem(last=False)
+
+            # Re-inserting moves the template to the most recent position
+            self._templates[source] = template
+
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+class RenderCache(object):
+    "Memoizes the values rendered by templates with the same variables"
+
+    def __init__(self, template_cache, maxsize=DEFAULT_RENDER_CACHE_SIZE):
+        self.template_cache = template_cache
+        self.maxsize = maxsize
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def render(self, source, fingerprint, **variables):
+        # The fingerprint shall change whenever the variables change
+        key = (source, fingerprint)
+
+        with self._lock:
+            try:
+                value = self._values.pop(key)
+                self._values[key] = value
+                return value
+            except KeyError:
+                pass
+
+        value = self.template_cache.get(source).render(**variables)
+
+        with self._lock:
+            if len(self._values) >= self.maxsize:
+                self._values.popitem(last=False)
+            self._values[key] = value
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+def fingerprint(variables):
+    if variables is None:
+        return None
+
+    # Equal variables may have different representations, which only
+    # costs a new rendering
+    return repr(sorted(variables.items()))
+
+
+def _environment():
+    import jinja2
+
+    return jinja2.Environment()
+
+
+def _config_environment():
+    import jinja2
+
+    return jinja2.Environment(undefined=jinja2.DebugUndefined)
+
+
+# Templates rendered with the version parts (serializers, VCS messages)
+cache = TemplateCache(environment_factory=_environment, fast_path=True)
+
+# Templates in the configuration file, where unknown variables like
+# {{major}} shall be kept as they are to be rendered later
+config_cache = TemplateCache(environment_factory=_config_environment)
+
+# Values of the configuration variables, that are usually the same for
+# many files
+config_render_cache = RenderCache(config_cache)
+
+
+def get_template(source):
+    return cache.get(source)
+
+
+def get_config_template(source):
+    return config_cache.get(source)
+
+
+def render_config_value(source, global_variables, global_fingerprint=None):
+    if global_fingerprint is None:
+        global_fingerprint = fingerprint(global_variables)
+
+    return config_render_cache.render(
+        source, global_fingerprint, GLOBALS=global_variables)
@@ -0,0 +1,183 @@
+import io
+import json
+import os
+import shutil
+import threading
+
+import six
+
+from punch.file_index import DEFAULT_IGNORE
+from punch.helpers import TEMP_FILE_PREFIX, replace_file, temp_filepath_for
+
+JOURNAL_FILE_NAME = ".punch_journal"
+
+
+class TransactionError(Exception):
+    "An exception used to signal that a transaction cannot be completed"
+
+
+def _fsync_file(filepath):
+    fd = os.open(filepath, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(dirpath):
+    # Directories cannot be opened on some systems (e.g. Windows),
+    # where renames are made durable by the file system itself
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _remove_if_exists(filepath):
+    try:
+        os.remove(filepath)
+    except OSError:
+        pass
+
+
+def _remove_staged_files(directory):
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if d not in DEFAULT_IGNORE]
+
+        for filename in filenames:
+            if filename.startswith(TEMP_FILE_PREFIX):
+                _remove_if_exists(os.path.join(dirpath, filename))
+
+
+class Transaction(object):
+
+    def __init__(self, journal_path=JOURNAL_FILE_NAME):
+        self.journal_path = journal_path
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def add(self, target, staged_path):
+        with self._lock:
+            self.entries.append({
+                'target': os.path.abspath(target),
+                'staged': os.path.abspath(staged_path),
+                'backup': os.path.abspath(staged_path) + '.orig'
+            })
+
+    def stage(self, target, content):
+        staged_path = temp_filepath_for(target)
+
+        if six.PY2:
+            with io.open(staged_path, 'w', encoding='utf8') as f:
+                f.write(content.decode('utf8'))
+        else:
+            with io.open(staged_path, 'w') as f:
+                f.write(content)
+
+        if os.path.exists(target):
+            shutil.copymode(target, staged_path)
+
+        self.add(target, staged_path)
+
+    def _directories(self):
+        return set(os.path.dirname(e['target']) for e in self.entries)
+
+    def _write_journal(self):
+        journal_content = json.dumps({'entries': self.entries}, indent=4)
+
+        # A crash while writing shall never leave a truncated journal
+        temp_path = temp_filepath_for(self.journal_path)
+        with io.open(temp_path, 'w') as f:
+            f.write(six.text_type(journal_content))
+            f.flush()
+            os.fsync(f.fileno())
+
+        replace_file(temp_path, self.journal_path)
+
+        _fsync_directory(os.path.dirname(os.path.abspath(self.journal_path)))
+
+    def commit(self):
+        if len(self.entries) == 0:
+            return
+
+        if os.path.exists(self.journal_path):
+            raise TransactionError(
+                "The journal {} of a previous transaction exists".format(
+                    self.journal_path))
+
+        # Group commit: all the new contents reach the disk before any of
+        # them replaces a file, so a single crash point cannot leave
+        # some files with unsynced data
+        for entry in self.entries:
+            _fsync_file(entry['staged'])
+
+        self._write_journal()
+
+        for entry in self.entries:
+            if not os.path.exists(entry['target']):
+                continue
+
+            try:
+                os.link(entry['target'], entry['backup'])
+            except (AttributeError, OSError):
+                shutil.copy2(entry['target'], entry['backup'])
+
+        directories = self._directories()
+        for directory in directories:
+            _fsync_directory(directory)
+
+        for entry in self.entries:
+            replace_file(entry['staged'], entry['target'])
+
+        for directory in directories:
+            _fsync_directory(directory)
+
+        for entry in self.entries:
+            _remove_if_exists(entry['backup'])
+
+        os.remove(self.journal_path)
+        self.entries = []
+
+    def rollback(self):
+        for entry in self.entries:
+            _remove_if_exists(entry['staged'])
+
+        self.entries = []
+
+    @classmethod
+    def recover(cls, journal_path=JOURNAL_FILE_NAME, replay=False):
+        try:
+            with io.open(journal_path, 'r') as f:
+                entries = json.load(f)['entries']
+        except (ValueError, KeyError, TypeError):
+            # The journal is written before any file is replaced, so
+            # none was replaced if it is not complete
+            _remove_staged_files(
+                os.path.dirname(os.path.abspath(journal_path)))
+            os.remove(journal_path)
+            return []
+
+        for entry in entries:
+            if replay:
+                # Files already renamed have no staged content left
+                if os.path.exists(entry['staged']):
+                    replace_file(entry['staged'], entry['target'])
+            elif os.path.exists(entry['backup']):
+                replace_file(entry['backup'], entry['target'])
+
+            _remove_if_exists(entry['staged'])
+            _remove_if_exists(entry['backup'])
+
+        for directory in set(os.path.dirname(e['target']) for e in entries):
+            _fsync_directory(directory)
+
+        os.remove(journal_path)
+
+        return [e['target'] for e in entries]
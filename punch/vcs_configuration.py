@@ -1,6 +1,6 @@
 import collections
 
-from jinja2 import Template
+from punch import templates
 
 
 class VCSConfiguration(object):
@@ -13,7 +13,7 @@ class VCSConfiguration(object):
             commit_message = \
                 "Version updated {{ current_version }} -> {{ new_version }}"
 
-        commit_message_template = Template(commit_message)
+        commit_message_template = templates.get_template(commit_message)
 
         template_variables = {}
         template_variables.update(global_variables)
@@ -26,7 +26,7 @@ class VCSConfiguration(object):
         self.options = {}
         for key, value in options.items():
             if isinstance(value, collections.Sequence):
-                value_template = Template(value)
+                value_template = templates.get_template(value)
                 self.options[key] = value_template.render(**template_variables)
             else:
                 self.options[key] = value
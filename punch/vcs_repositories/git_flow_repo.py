@@ -41,8 +41,7 @@ class GitFlowRepo(gr.GitRepo):
                     self.working_path))
 
     def pre_start_release(self):
-        output = self._run([self.command, "status"])
-        if "Changes to be committed:" in output:
+        if self.get_status().staged:
             raise RepositoryStatusError(
                 "Cannot checkout master while repository" +
                 " contains uncommitted changes")
@@ -63,14 +62,12 @@ class GitFlowRepo(gr.GitRepo):
                 self.config_obj.options['new_version']
             ])
 
-    def finish_release(self):
+    def finish_release(self, files=None):
         branch = self.get_current_branch()
 
-        self._run([self.command, "add", "."])
+        self._stage(files)
 
-        output = self._run([self.command, "status"])
-        if "nothing to commit, working directory clean" in output or \
-                "nothing to commit, working tree clean" in output:
+        if not self.get_status().staged:
             self._run([self.command, "checkout", "develop"])
             self._run([self.command, "branch", "-d", branch])
             return
@@ -0,0 +1,178 @@
+import io
+import os
+import subprocess
+import threading
+
+from punch.vcs_repositories.exceptions import RepositorySystemError
+
+
+def find_git_dir(working_path):
+    git_path = os.path.join(working_path, '.git')
+
+    # Worktrees and submodules have a .git file pointing to the real
+    # repository directory
+    if os.path.isfile(git_path):
+        with io.open(git_path, 'r') as f:
+            content = f.read().strip()
+
+        if not content.startswith('gitdir:'):
+            return None
+
+        git_dir = content[len('gitdir:'):].strip()
+        return os.path.normpath(os.path.join(working_path, git_dir))
+
+    if os.path.isdir(git_path):
+        return git_path
+
+    return None
+
+
+class RefsReader(object):
+    """Reads HEAD and references straight from the repository files.
+
+    Every method returns None when the repository layout is not the
+    classic files backend, and callers shall then fall back to git.
+    """
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.common_dir = self._common_dir(git_dir)
+
+    @staticmethod
+    def _common_dir(git_dir):
+        # Linked worktrees keep HEAD in their own directory, while the
+        # shared references live in the directory named by commondir
+        if git_dir is None:
+            return None
+
+        try:
+            with io.open(os.path.join(git_dir, 'commondir'), 'r') as f:
+                common_dir = f.read().strip()
+        except (IOError, OSError):
+            return git_dir
+
+        return os.path.normpath(os.path.join(git_dir, common_dir))
+
+    def _is_supported(self):
+        return self.git_dir is not None and \
+            not os.path.exists(os.path.join(self.common_dir, 'reftable'))
+
+    def _read(self, *path):
+        with io.open(os.path.join(self.git_dir, *path), 'r') as f:
+            return f.read()
+
+    def current_branch(self):
+        if not self._is_supported():
+            return None
+
+        try:
+            head = self._read('HEAD').strip()
+        except (IOError, OSError):
+            return None
+
+        if head.startswith('ref: refs/heads/'):
+            return head[len('ref: refs/heads/'):]
+
+        # A detached HEAD contains the commit hash
+        if head.startswith('ref: '):
+            return None
+
+        return 'HEAD'
+
+    def refs(self, prefix):
+        if not self._is_supported():
+            return None
+
+        refs = {}
+
+        try:
+            with io.open(os.path.join(self.common_dir, 'packed-refs'),
+                         'r') as f:
+                packed_refs = f.read()
+        except (IOError, OSError):
+            packed_refs = ''
+
+        for line in packed_refs.splitlines():
+            if line.startswith('#') or line.startswith('^') or not line:
+                continue
+
+            sha, name = line.split(' ', 1)
+            if name.startswith(prefix):
+                refs[name[len(prefix):]] = sha
+
+        # Loose references take precedence over packed ones
+        refs_dir = os.path.join(
+            self.common_dir, *prefix.rstrip('/').split('/'))
+        for dirpath, dirnames, filenames in os.walk(refs_dir):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                name = os.path.relpath(filepath, refs_dir).replace(
+                    os.sep, '/')
+                with io.open(filepath, 'r') as f:
+                    refs[name] = f.read().strip()
+
+        return refs
+
+
+class CatFileBatch(object):
+    """A long-lived ``git cat-file --batch-check`` process.
+
+    Resolving revisions through it costs a pipe round trip instead of
+    starting a new git process for each query.
+    """
+
+    def __init__(self, working_path, command='git'):
+        self.working_path = working_path
+        self.command = command
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        try:
+            self._process = subprocess.Popen(
+                [self.command, 'cat-file', '--batch-check'],
+                cwd=self.working_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError:
+            raise RepositorySystemError(
+                "Cannot run {} cat-file".format(self.command))
+
+    def resolve(self, revision):
+        if '\n' in revision:
+            return None
+
+        with self._lock:
+            if self._process is None:
+                self._start()
+
+            try:
+                self._process.stdin.write(
+                    revision.encode('utf8') + b'\n')
+                self._process.stdin.flush()
+                line = self._process.stdout.readline().decode('utf8')
+            except (IOError, OSError):
+                self._process = None
+                raise RepositorySystemError(
+                    "The {} cat-file process died".format(self.command))
+
+        # Unknown revisions are reported as "<revision> missing"
+        fields = line.split()
+        if len(fields) != 3:
+            return None
+
+        sha, object_type, size = fields
+        return sha, object_type
+
+    def close(self):
+        with self._lock:
+            if self._process is None:
+                return
+
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process.stderr.close()
+            self._process = None
@@ -1,6 +1,7 @@
 import os
 import six
 from punch.vcs_repositories import exceptions as e
+from punch.vcs_repositories import git_plumbing as gp
 from punch.vcs_repositories import vcs_repo as vr
 
 
@@ -17,6 +18,18 @@ class GitRepo(vr.VCSRepo):
             True
         )
 
+        # Commits the release on master through plumbing commands,
+        # without creating a release branch or switching branches
+        self.plumbing_release = self.config_obj.options.get(
+            'plumbing_release',
+            False
+        )
+
+        # Reads are answered from the repository files or from a single
+        # long-lived git process instead of spawning git for each query
+        self._refs = gp.RefsReader(gp.find_git_dir(self.working_path))
+        self._cat_file = gp.CatFileBatch(self.working_path, self.command)
+
     def _check_config(self):
         # Tag names cannot contain spaces
         tag = self.config_obj.options.get('tag', '')
@@ -41,6 +54,10 @@ class GitRepo(vr.VCSRepo):
         self.command = 'git'
 
     def get_current_branch(self):
+        branch = self._refs.current_branch()
+        if branch is not None:
+            return branch
+
         stdout = self._run([self.command, "rev-parse", "--abbrev-ref", "HEAD"])
 
         branch = stdout.replace("\n", "")
@@ -48,19 +65,98 @@ class GitRepo(vr.VCSRepo):
         return branch
 
     def get_tags(self):
-        return self._run([self.command, "tag"])
+        tags = self._refs.refs('refs/tags/')
+        if tags is None:
+            return self._run([self.command, "tag"])
+
+        return "".join(t + "\n" for t in sorted(tags))
+
+    def list_tags(self):
+        stdout = self._run([
+            self.command, "for-each-ref",
+            "--format=%(refname)%00%(objectname)%00%(*objectname)",
+            "refs/tags"
+        ])
+
+        tags = []
+        for line in stdout.splitlines():
+            refname, objectname, peeled = line.split('\0')
+            # Annotated tags point to the commit through the tag object
+            tags.append((refname[len('refs/tags/'):], peeled or objectname))
+
+        return tags
+
+    def resolve(self, revision):
+        return self._cat_file.resolve(revision)
+
+    def close(self):
+        self._cat_file.close()
 
     def get_branches(self):
         return self._run([self.command, "branch"])
 
+    def get_status(self, untracked=False):
+        output = self._run([
+            self.command,
+            "status",
+            "--porcelain=v2",
+            "-z",
+            "--untracked-files={}".format("normal" if untracked else "no")
+        ])
+
+        return self._parse_status(output)
+
+    @classmethod
+    def _parse_status(cls, output):
+        staged = set()
+        unstaged = set()
+        unmerged = set()
+        untracked = set()
+
+        records = iter(output.split("\0"))
+        for record in records:
+            if not record:
+                continue
+
+            record_type = record[0]
+
+            if record_type == "1":
+                fields = record.split(" ", 8)
+            elif record_type == "2":
+                fields = record.split(" ", 9)
+                # Renames and copies are followed by the original path
+                next(records)
+            elif record_type == "u":
+                unmerged.add(record.split(" ", 10)[10])
+                continue
+            elif record_type == "?":
+                untracked.add(record[2:])
+                continue
+            else:
+                continue
+
+            xy, path = fields[1], fields[-1]
+            if xy[0] != ".":
+                staged.add(path)
+            if xy[1] != ".":
+                unstaged.add(path)
+
+        return vr.RepositoryStatus(
+            frozenset(staged),
+            frozenset(unstaged),
+            frozenset(unmerged),
+            frozenset(untracked)
+        )
+
     def pre_start_release(self):
-        output = self._run([self.command, "status"])
-        if "Changes to be committed:" in output:
+        if self.get_status().staged:
             raise e.RepositoryStatusError(
                 "Cannot checkout master while repository" +
                 " contains uncommitted changes")
 
-        self._run([self.command, "checkout", "master"])
+        if not self.plumbing_release or \
+                self.get_current_branch() != "master":
+            self._run([self.command, "checkout", "master"])
 
         branch = self.get_current_branch()
 
@@ -68,8 +164,13 @@ class GitRepo(vr.VCSRepo):
             raise e.RepositoryStatusError(
                 "Current branch shall be master but is {}".format(branch))
 
+        tag_value = self._configured_tag()
+        if self.resolve("refs/tags/" + tag_value) is not None:
+            raise e.RepositoryStatusError(
+                "The tag {} already exists".format(tag_value))
+
     def start_release(self):
-        if self.make_release_branch:
+        if self.make_release_branch and not self.plumbing_release:
             self._run([
                 self.command,
                 "checkout",
@@ -77,16 +178,16 @@ class GitRepo(vr.VCSRepo):
                 self.config_obj.options['new_version']
             ])
 
-    def finish_release(self):
-        branch = self.get_current_branch()
+    def finish_release(self, files=None):
+        if self.plumbing_release:
+            self._finish_plumbing_release(files)
+            return
 
-        self._run([self.command, "add", "."])
+        branch = self.get_current_branch()
 
-        output = self._run([self.command, "status"])
+        self._stage(files)
 
-        if ("nothing to commit, working directory clean" in output or
-                "nothing to commit, working tree clean" in output) and \
-                self.make_release_branch:
+        if not self.get_status().staged and self.make_release_branch:
             self._run([self.command, "checkout", "master"])
             self._run([self.command, "branch", "-d", branch])
             return
@@ -101,10 +202,58 @@ class GitRepo(vr.VCSRepo):
             self._run([self.command, "merge", branch])
             self._run([self.command, "branch", "-d", branch])
 
-        try:
-            tag_value = self.config_obj.options['tag']
-        except KeyError:
-            tag_value = self.config_obj.options['new_version']
+        self._create_release_tag()
+
+    def _stage(self, files):
+        if files is None:
+            self._run([self.command, "add", "."])
+            return
+
+        if len(files) == 0:
+            return
+
+        # Only the given paths are hashed, instead of the whole tree
+        paths = "\0".join(self._relative_paths(files)) + "\0"
+        self._run(
+            [self.command, "update-index", "--add", "-z", "--stdin"],
+            input=paths.encode('utf8')
+        )
+
+    def _finish_plumbing_release(self, files=None):
+        self._stage(files)
+
+        tree = self._run([self.command, "write-tree"]).strip()
+
+        head = self.resolve("HEAD")
+        head_tree = self.resolve("HEAD^{tree}")
+        if head_tree is not None and head_tree[0] == tree:
+            return
+
+        command_line = [self.command, "commit-tree", tree]
+        if head is not None:
+            command_line.extend(["-p", head[0]])
+        command_line.extend(["-m", self.config_obj.commit_message])
+
+        commit = self._run(command_line).strip()
+
+        # The old value makes the update fail if master moved meanwhile
+        old_commit = head[0] if head is not None else "0" * len(commit)
+        reflog_message = "commit: {}".format(
+            self.config_obj.commit_message.split("\n", 1)[0])
+        self._run([
+            self.command,
+            "update-ref",
+            "-m",
+            reflog_message,
+            "HEAD",
+            commit,
+            old_commit
+        ])
+
+        self._create_release_tag()
+
+    def _create_release_tag(self):
+        tag_value = self._configured_tag()
 
         if self.config_obj.options.get('annotate_tags', False):
             annotation_message = self.config_obj.options.get(
@@ -125,3 +274,9 @@ class GitRepo(vr.VCSRepo):
 
     def tag(self, tag_name):
         self._run([self.command, "tag", tag_name])
+
+    def _configured_tag(self):
+        try:
+            return self.config_obj.options['tag']
+        except KeyError:
+            return self.config_obj.options['new_version']
@@ -0,0 +1,148 @@
+import os
+import struct
+import subprocess
+import threading
+
+from punch.vcs_repositories.exceptions import RepositorySystemError
+
+
+class CommandServerError(RepositorySystemError):
+    "An exception used to signal that the command server cannot be used"
+
+
+class HgCommandServer(object):
+    """A long-lived ``hg serve --cmdserver pipe`` process.
+
+    Each command costs a pipe round trip instead of starting a new
+    Mercurial interpreter. See Mercurial's CommandServer wiki page for
+    the description of the protocol.
+    """
+
+    def __init__(self, working_path, command='hg'):
+        self.working_path = working_path
+        self.command = command
+        self.capabilities = set()
+        self.encoding = None
+        self._process = None
+        self._devnull = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._process is not None
+
+    def start(self):
+        with self._lock:
+            if self._process is None:
+                self._start()
+
+    def _start(self):
+        self._devnull = open(os.devnull, 'wb')
+
+        try:
+            self._process = subprocess.Popen(
+                [self.command, 'serve', '--cmdserver', 'pipe',
+                 '--config', 'ui.interactive=False'],
+                cwd=self.working_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._devnull
+            )
+        except OSError:
+            self._stop()
+            raise CommandServerError(
+                "Cannot run {} serve".format(self.command))
+
+        channel, hello = self._read_message()
+        if channel != b'o':
+            self._stop()
+            raise CommandServerError(
+                "Unexpected hello message on channel {!r}".format(channel))
+
+        for line in hello.decode('ascii', 'replace').splitlines():
+            key, _, value = line.partition(': ')
+            if key == 'capabilities':
+                self.capabilities = set(value.split())
+            elif key == 'encoding':
+                self.encoding = value
+
+        if 'runcommand' not in self.capabilities:
+            self._stop()
+            raise CommandServerError(
+                "The command server does not support runcommand")
+
+    def _read(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self._process.stdout.read(size - len(data))
+            if not chunk:
+                self._stop()
+                raise CommandServerError("The command server died")
+            data += chunk
+
+        return data
+
+    def _read_message(self):
+        channel, length = struct.unpack('>cI', self._read(5))
+
+        # Input channels carry the requested size instead of data
+        if channel in (b'I', b'L'):
+            return channel, length
+
+        return channel, self._read(length)
+
+    def _write(self, data):
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (IOError, OSError):
+            self._stop()
+            raise CommandServerError("The command server died")
+
+    def runcommand(self, args):
+        with self._lock:
+            if self._process is None:
+                self._start()
+
+            arguments = b'\0'.join(a.encode('utf8') for a in args)
+            self._write(b'runcommand\n' +
+                        struct.pack('>I', len(arguments)) + arguments)
+
+            stdout = []
+            stderr = []
+            while True:
+                channel, data = self._read_message()
+
+                if channel == b'o':
+                    stdout.append(data)
+                elif channel == b'e':
+                    stderr.append(data)
+                elif channel == b'r':
+                    returncode = struct.unpack('>i', data)[0]
+                    return returncode, b''.join(stdout), b''.join(stderr)
+                elif channel in (b'I', b'L'):
+                    # Commands run non-interactively, an empty block
+                    # signals the end of the input
+                    self._write(struct.pack('>I', 0))
+                elif channel.isupper():
+                    self._stop()
+                    raise CommandServerError(
+                        "Unexpected required channel {!r}".format(channel))
+
+    def _stop(self):
+        if self._process is not None:
+            for stream in (self._process.stdin, self._process.stdout):
+                try:
+                    stream.close()
+                except (IOError, OSError):
+                    pass
+            self._process.wait()
+            self._process = None
+
+        if self._devnull is not None:
+            self._devnull.close()
+            self._devnull = None
+
+    def close(self):
+        with self._lock:
+            self._stop()
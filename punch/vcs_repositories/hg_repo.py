@@ -1,8 +1,10 @@
+import json
 import os
 
 import re
 import six
 
+from punch.vcs_repositories import hg_command_server as hcs
 from punch.vcs_repositories import vcs_repo as vr
 from punch.vcs_repositories import exceptions as e
 
@@ -11,6 +13,8 @@ class HgRepo(vr.VCSRepo):
     DEFAULT_BRANCH = 'default'
 
     def __init__(self, working_path, config_obj):
+        self._server = None
+
         if six.PY2:
             super(HgRepo, self).__init__(working_path, config_obj)
         else:
@@ -19,6 +23,41 @@ class HgRepo(vr.VCSRepo):
         self.branch = self.config_obj.options.get('branch', 'default')
         self._recorded_branch = None
 
+        if self.config_obj.options.get('command_server', True):
+            self._server = hcs.HgCommandServer(working_path, self.command)
+
+    def _run(self, command_line, error_message=None, input=None):
+        if self._server is None or input is not None or \
+                command_line[0] != self.command:
+            return self._run_process(command_line, error_message, input)
+
+        if not self._server.running:
+            try:
+                self._server.start()
+            except hcs.CommandServerError:
+                # Go on with a new process for each command
+                self._server = None
+                return self._run_process(command_line, error_message, input)
+
+        # A failure here cannot fall back, as the command may have been
+        # executed already
+        returncode, stdout, stderr = self._server.runcommand(
+            command_line[1:])
+
+        return self._check_result(
+            command_line, returncode, stdout, stderr, error_message)
+
+    def _run_process(self, command_line, error_message=None, input=None):
+        if six.PY2:
+            return super(HgRepo, self)._run(
+                command_line, error_message, input)
+        else:
+            return super()._run(command_line, error_message, input)
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
     def get_current_branch(self):
         stdout = self._run([self.command, "branch"])
 
@@ -38,6 +77,12 @@ class HgRepo(vr.VCSRepo):
         )
         return "\n".join(tags)
 
+    def list_tags(self):
+        stdout = self._run([self.command, "tags", "-T", "json"])
+
+        return [(t['tag'], t['node']) for t in json.loads(stdout)
+                if t['tag'] != 'tip']
+
     def get_summary(self):
         output = self._run([self.command, "summary"])
         keys = {"branch", "commit", "update"}
@@ -52,6 +97,49 @@ class HgRepo(vr.VCSRepo):
 
         return summary
 
+    def get_status(self, untracked=False):
+        # Mercurial has no staging area, all the changes to tracked files
+        # are committed while missing files have to be removed first
+        output = self._run([
+            self.command,
+            "status",
+            "-mard" + ("u" if untracked else ""),
+            "-0"
+        ])
+        resolve_output = self._run([self.command, "resolve", "--list"])
+
+        return self._parse_status(output, resolve_output)
+
+    @classmethod
+    def _parse_status(cls, output, resolve_output=""):
+        staged = set()
+        unstaged = set()
+        unmerged = set()
+        untracked = set()
+
+        for record in output.split("\0"):
+            if not record:
+                continue
+
+            code, path = record[0], record[2:]
+            if code in "MAR":
+                staged.add(path)
+            elif code == "!":
+                unstaged.add(path)
+            elif code == "?":
+                untracked.add(path)
+
+        for line in resolve_output.splitlines():
+            if line.startswith("U "):
+                unmerged.add(line[2:])
+
+        return vr.RepositoryStatus(
+            frozenset(staged),
+            frozenset(unstaged),
+            frozenset(unmerged),
+            frozenset(untracked)
+        )
+
     def pre_start_release(self):
         if not self._is_clean():
             raise e.RepositoryStatusError(
@@ -71,13 +159,15 @@ class HgRepo(vr.VCSRepo):
     def start_release(self):
         pass
 
-    def finish_release(self):
+    def finish_release(self, files=None):
         self.get_current_branch()
         try:
             if self._is_clean():
                 return
             command_line = [self.command, "commit"]
             command_line.extend(["-m", self.config_obj.commit_message])
+            if files is not None:
+                command_line.extend(self._relative_paths(files))
             self._run(command_line)
             tag = self._configured_tag()
             self.tag(tag)
@@ -123,7 +213,7 @@ class HgRepo(vr.VCSRepo):
         self.command = 'hg'
 
     def _is_clean(self):
-        return self.get_summary()["commit"].endswith("(clean)")
+        return self.get_status().is_clean()
 
     @classmethod
     def _parse_branch_line(cls, line):
@@ -0,0 +1,15 @@
+def repo_class(name):
+    "The repository class of a version control system"
+    if name == 'git':
+        from punch.vcs_repositories import git_repo as gr
+        return gr.GitRepo
+    elif name == 'git-flow':
+        from punch.vcs_repositories import git_flow_repo as gfr
+        return gfr.GitFlowRepo
+    elif name == 'hg':
+        from punch.vcs_repositories import hg_repo as hr
+        return hr.HgRepo
+
+    raise ValueError(
+        "The requested version control system {} is not supported.".format(
+            name))
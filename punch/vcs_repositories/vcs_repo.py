@@ -1,9 +1,19 @@
+import collections
+import os
 import subprocess
 
 import six
 from punch.vcs_repositories.exceptions import RepositorySystemError
 
 
+class RepositoryStatus(collections.namedtuple(
+        'RepositoryStatus',
+        ['staged', 'unstaged', 'unmerged', 'untracked'])):
+
+    def is_clean(self):
+        return not (self.staged or self.unstaged or self.unmerged)
+
+
 class VCSRepo(object):
 
     def __init__(self, working_path, config_obj):
@@ -41,16 +51,22 @@ class VCSRepo(object):
             raise RepositorySystemError(
                 "Error running {}".format(self.command))
 
-    def _run(self, command_line, error_message=None):
+    def _run(self, command_line, error_message=None, input=None):
         p = subprocess.Popen(
             command_line,
             cwd=self.working_path,
+            stdin=subprocess.PIPE if input is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
-        stdout, stderr = p.communicate()
+        stdout, stderr = p.communicate(input)
+
+        return self._check_result(
+            command_line, p.returncode, stdout, stderr, error_message)
 
-        if p.returncode != 0:
+    def _check_result(self, command_line, returncode, stdout, stderr,
+                      error_message=None):
+        if returncode != 0:
             if error_message is not None:
                 raise RepositorySystemError(error_message.format(stderr))
             else:
@@ -70,8 +86,17 @@ class VCSRepo(object):
     def start_release(self):
         pass
 
-    def finish_release(self):
+    def _relative_paths(self, files):
+        return [
+            os.path.relpath(os.path.abspath(f), self.working_path)
+            for f in files
+        ]
+
+    def finish_release(self, files=None):
         pass
 
     def post_finish_release(self):
         pass
+
+    def close(self):
+        pass
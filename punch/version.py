@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
 
 import collections
+import functools
+import re
+import threading
+
+from punch import templates
+from punch import version_file
 from punch import version_part as vpart
 from punch.helpers import import_file
 
 
+@functools.total_ordering
 class Version():
 
     def __init__(self):
@@ -18,9 +25,28 @@ class Version():
     def values(self):
         return list(self.parts.values())
 
+    # Sorting many versions with this key is faster than comparing them
+    @property
+    def sort_key(self):
+        return tuple(part.sort_key for part in self.parts.values())
+
     def __eq__(self, other):
         return self.as_dict() == other.as_dict()
 
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        if list(self.parts) != list(other.parts):
+            raise TypeError(
+                "Cannot compare versions with parts {} and {}".format(
+                    self.keys, other.keys))
+
+        return self.sort_key < other.sort_key
+
+    def __hash__(self):
+        return hash(frozenset(self.as_dict().items()))
+
     def add_part(self, part):
         self.keys.append(part.name)
         self.parts[part.name] = part
@@ -70,36 +96,142 @@ class Version():
         return list((key, part.value) for key, part in self.parts.items())
 
     def to_file(self, version_filepath):
-        with open(version_filepath, 'w') as f:
-            for key, part in self.parts.items():
-                f.write("{0} = {1}\n".format(key, part.value))
+        version_file.write(version_filepath, self)
 
     @classmethod
-    def from_file(cls, version_filepath, version_description):
-        version_module = import_file(version_filepath)
+    def from_file(cls, version_filepath, version_description,
+                  execute=False):
+        # Executing the file as a module is only needed for version
+        # files that are not made of simple assignments
+        if execute:
+            values = vars(import_file(version_filepath))
+        else:
+            values = version_file.read(version_filepath)
+
         version = Version()
 
         for version_part in version_description:
             if isinstance(version_part, collections.Mapping):
                 version_part_name = version_part['name']
-                version_part['value'] = cls._get_version_part(
-                    version_module, version_part, version_part_name)
-                version.add_part_from_dict(version_part)
+                version.add_part_from_dict(dict(
+                    version_part,
+                    value=cls._get_version_part(values, version_part_name)
+                ))
             else:
                 version_part_name = version_part
                 version_part_value = cls._get_version_part(
-                    version_module, version_part, version_part_name)
+                    values, version_part_name)
                 version.create_part(version_part_name, version_part_value)
 
         return version
 
     @classmethod
-    def _get_version_part(cls, version_module,
-                          version_part, version_part_name):
+    def from_description(cls, version_description):
+        "A version with the initial value of each described part"
+        version = Version()
+
+        for version_part in version_description:
+            if isinstance(version_part, collections.Mapping):
+                version.add_part_from_dict(dict(version_part, value=None))
+            else:
+                version.create_part(version_part, None)
+
+        return version
+
+    @classmethod
+    def from_string(cls, version_string, serializer, version_description):
+        parser = get_parser(serializer, version_description)
+        version = parser.parse(version_string)
+
+        if version is None:
+            raise ValueError(
+                "The string {} does not match the serializer {}".format(
+                    version_string, serializer))
+
+        return version
+
+    @classmethod
+    def _get_version_part(cls, values, version_part_name):
         try:
-            return getattr(version_module, version_part_name)
-        except AttributeError:
+            return values[version_part_name]
+        except KeyError:
             raise ValueError(
                 "Given version file is invalid:" +
                 " missing '{}' variable".format(version_part_name)
             )
+
+
+class VersionParser(object):
+    """Parses strings rendered by a serializer back into versions.
+
+    Only serializers made of plain {{ part }} substitutions can be
+    parsed. Each part is matched by its own regular expression and the
+    matched text is converted to the type of the part.
+    """
+
+    def __init__(self, version, serializer):
+        self.version = version
+        self.serializer = serializer
+
+        template = templates.SimpleTemplate.from_source(serializer)
+        if template is None:
+            raise ValueError(
+                "The serializer {} cannot be parsed".format(serializer))
+
+        self.names = []
+        self._converters = []
+
+        regex = re.escape(template.literals[0])
+        for name, literal in zip(template.names, template.literals[1:]):
+            if name in self.names:
+                regex += '(?P={})'.format(name)
+            elif name in version.parts:
+                part = version.parts[name]
+                regex += '(?P<{}>{})'.format(name, part.pattern())
+                self.names.append(name)
+                self._converters.append(part.parse)
+            else:
+                regex += '.*?'
+            regex += re.escape(literal)
+
+        self.regex = re.compile(regex + r'\Z')
+
+    def parse_dict(self, version_string):
+        "The typed values of the parts, without building a version"
+        match = self.regex.match(version_string)
+        if match is None:
+            return None
+
+        return dict(zip(
+            self.names,
+            [c(v) for c, v in zip(self._converters, match.groups())]
+        ))
+
+    def parse(self, version_string):
+        values = self.parse_dict(version_string)
+        if values is None:
+            return None
+
+        version = self.version.copy()
+        for name, value in values.items():
+            version.parts[name].value = value
+
+        return version
+
+
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def get_parser(serializer, version_description):
+    # Descriptions contain dictionaries, their representation is hashable
+    key = (serializer, repr(version_description))
+
+    with _parsers_lock:
+        try:
+            return _parsers[key]
+        except KeyError:
+            parser = VersionParser(
+                Version.from_description(version_description), serializer)
+            _parsers[key] = parser
+            return parser
@@ -0,0 +1,81 @@
+import ast
+import collections
+import io
+import re
+
+import six
+
+ASSIGNMENT = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_]*)\s*=(.*)\Z')
+
+# A trailing comment, unless the hash is inside a quoted string
+COMMENT = re.compile(r'\s#[^\'"]*\Z')
+
+
+def parse(content):
+    """Reads the variables of a version file without executing it.
+
+    Each line shall be empty, a comment or a 'name = value' assignment.
+    Values that are not Python literals are read as strings, as Punch
+    used to write strings without quotes.
+    """
+    values = collections.OrderedDict()
+
+    for line_number, line in enumerate(content.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+
+        match = ASSIGNMENT.match(line)
+        if match is None:
+            raise ValueError(
+                "Line {} of the version file is not".format(line_number) +
+                " a simple assignment, the file can be read" +
+                " with --import-version-file")
+
+        name = match.group(1)
+        value = COMMENT.sub('', match.group(2)).strip()
+        try:
+            values[name] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            values[name] = value
+
+    return values
+
+
+def read(filepath):
+    if six.PY2:
+        with io.open(filepath, 'r', encoding='utf8') as f:
+            return parse(f.read())
+    else:
+        with io.open(filepath, 'r') as f:
+            return parse(f.read())
+
+
+def _literal(value):
+    if isinstance(value, six.string_types):
+        return "'{}'".format(
+            value.replace('\\', '\\\\').replace("'", "\\'").replace(
+                '\n', '\\n'))
+
+    return six.text_type(value)
+
+
+def render(version):
+    return ''.join(
+        '{} = {}\n'.format(name, _literal(part.value))
+        for name, part in version.parts.items()
+    )
+
+
+def write(filepath, version):
+    content = render(version)
+
+    if six.PY2:
+        if isinstance(content, bytes):
+            content = content.decode('utf8')
+
+        with io.open(filepath, 'w', encoding='utf8') as f:
+            f.write(content)
+    else:
+        with io.open(filepath, 'w') as f:
+            f.write(content)
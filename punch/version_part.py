@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import functools
+import re
 import sys
 from datetime import datetime
 
+import six
+
 
 def _strftime(fmt):
     return datetime.now().strftime(fmt)
@@ -45,8 +49,91 @@ def strftime(fmt):
     return value
 
 
+# Regular expressions matching the values rendered by strftime
+CALVER_PATTERNS = {
+    'YYYY': r'\d{4}',
+    'YY': r'\d{1,2}',
+    '0M': r'\d{2}',
+    '0D': r'\d{2}',
+    'MM': r'\d{1,2}',
+    'DD': r'\d{1,2}',
+}
+
+STRFTIME_PATTERNS = {
+    'Y': r'\d{4}',
+    'y': r'\d{2}',
+    'm': r'\d{2}',
+    'd': r'\d{2}',
+    'H': r'\d{2}',
+    'M': r'\d{2}',
+    'S': r'\d{2}',
+    'j': r'\d{3}',
+    'U': r'\d{2}',
+    'W': r'\d{2}',
+    '%': '%',
+}
+
+
+def strftime_pattern(fmt):
+    try:
+        return CALVER_PATTERNS[fmt]
+    except KeyError:
+        pass
+
+    pattern = ''
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == '%' and i + 1 < len(fmt):
+            pattern += STRFTIME_PATTERNS.get(fmt[i + 1], r'.+?')
+            i += 2
+        else:
+            pattern += re.escape(fmt[i])
+            i += 1
+
+    return pattern
+
+
+@functools.total_ordering
 class VersionPart(object):
 
+    @property
+    def sort_key(self):
+        return self.value
+
+    def __eq__(self, other):
+        if not isinstance(other, VersionPart):
+            return NotImplemented
+
+        return (self.name, self.value) == (other.name, other.value)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+
+        return not equal
+
+    def __lt__(self, other):
+        if not isinstance(other, VersionPart):
+            return NotImplemented
+
+        if self.name != other.name:
+            raise TypeError(
+                "Cannot compare the version parts {} and {}".format(
+                    self.name, other.name))
+
+        return self.sort_key < other.sort_key
+
+    def __hash__(self):
+        return hash((self.name, self.value))
+
+    def pattern(self):
+        "A regular expression matching the rendered values of the part"
+        return r'.+?'
+
+    def parse(self, text):
+        return text
+
     @classmethod
     def from_dict(cls, dic):
         try:
@@ -81,6 +168,12 @@ class IntegerVersionPart(VersionPart):
     def set(self, value):
         self.value = int(value)
 
+    def pattern(self):
+        return r'\d+'
+
+    def parse(self, text):
+        return int(text)
+
     def reset(self):
         self.value = self.start_value
 
@@ -102,6 +195,15 @@ class ValueListVersionPart(VersionPart):
         # When copying this does not take the object itself
         self.values = [v for v in allowed_values]
 
+        # Values are ordered by their position in the list
+        self._positions = {}
+        for position, v in enumerate(self.values):
+            self._positions.setdefault(v, position)
+
+        self._rendered = {}
+        for v in self.values:
+            self._rendered.setdefault(six.text_type(v), v)
+
     def set(self, value):
         if value not in self.allowed_values:
             raise ValueError(
@@ -115,6 +217,18 @@ class ValueListVersionPart(VersionPart):
         idx = self.values.index(self.value)
         self.value = self.values[(idx + 1) % len(self.values)]
 
+    @property
+    def sort_key(self):
+        return self._positions[self.value]
+
+    def pattern(self):
+        # Longer values first, so that 'rc' is not matched as 'r'
+        rendered = sorted(self._rendered, key=len, reverse=True)
+        return '|'.join(re.escape(v) for v in rendered)
+
+    def parse(self, text):
+        return self._rendered[text]
+
     def reset(self):
         self.value = self.values[0]
 
@@ -133,6 +247,17 @@ class DateVersionPart(VersionPart):
         else:
             self.value = value
 
+    @property
+    def sort_key(self):
+        # Formats like MM are not padded, so '9' comes before '10'
+        if isinstance(self.value, six.string_types) and self.value.isdigit():
+            return int(self.value)
+
+        return self.value
+
+    def pattern(self):
+        return strftime_pattern(self.fmt)
+
     def reset(self):
         self.value = strftime(self.fmt)
 
@@ -0,0 +1,414 @@
+import argparse
+import collections
+import json
+import os
+import sys
+
+import six
+
+from punch import batch
+from punch import config as cfr
+from punch import file_configuration as fc
+from punch import file_index as fi
+from punch import file_updater as fu
+from punch import replacer as rep
+from punch import version as ver
+
+VERSION_FILE_NAME = 'punch_version.py'
+
+# Dependent packages are bumped on this part unless told otherwise
+DEFAULT_DEPENDENTS_PART = 'patch'
+
+Dependency = collections.namedtuple(
+    'Dependency', ['name', 'files', 'serializer'])
+
+PackageResult = collections.namedtuple(
+    'PackageResult',
+    ['name', 'wave', 'current_version', 'new_version', 'changed_files',
+     'exception']
+)
+
+
+class Package(object):
+
+    def __init__(self, name, directory, config):
+        self.name = name
+        self.directory = directory
+        self.config = config
+        self.dependencies = []
+
+    def __repr__(self):
+        return "Package({!r})".format(self.name)
+
+
+def _package_name(relpath):
+    name = os.path.dirname(relpath)
+    return name if name else os.curdir
+
+
+def _ref_name(name):
+    # Package names are paths, which are not valid in branch and tag
+    # names
+    if name == os.curdir:
+        return 'root'
+
+    return name.replace('/', '-').lstrip('.')
+
+
+def _normalize(name):
+    return os.path.normpath(name).replace(os.sep, '/')
+
+
+class Workspace(object):
+    """The packages found under a root directory.
+
+    Each directory with both a config file and a version file is a
+    package, named after its path relative to the root. Packages list
+    the packages they depend on in the DEPENDENCIES variable of their
+    config file, and are bumped after them.
+    """
+
+    def __init__(self, root=os.curdir, jobs=1, ignore=None,
+                 version_file=VERSION_FILE_NAME):
+        self.root = root
+        self.jobs = jobs
+        self.version_file = version_file
+        self.batch = batch.Batch(jobs)
+
+        self.packages = collections.OrderedDict()
+        for relpath in fi.FileIndex(root, ignore).expand(
+                '**/' + version_file):
+            name = _package_name(relpath)
+            directory = os.path.join(root, name)
+
+            if not os.path.exists(cfr.find_config_file(directory)):
+                continue
+
+            self.packages[name] = Package(
+                name, directory, self.batch.config(self._job(directory)))
+
+        self.dependents = dict((name, []) for name in self.packages)
+        for package in self.packages.values():
+            self._link(package)
+
+    def _job(self, directory, part=None, set_part=None, reset_on_set=False,
+             action=None):
+        return batch.Job(
+            directory=directory,
+            config_file=None,
+            version_file=self.version_file,
+            part=part,
+            set_part=set_part,
+            reset_on_set=reset_on_set,
+            action=action
+        )
+
+    def _link(self, package):
+        for declaration in package.config.dependencies:
+            if isinstance(declaration, six.string_types):
+                declaration = {'path': declaration}
+
+            # Paths of the dependencies are relative to the package
+            name = _normalize(os.path.join(package.name, declaration['path']))
+            if name not in self.packages:
+                raise ValueError(
+                    "Package {} depends on {}, which is not a package".format(
+                        package.name, declaration['path']))
+
+            serializer = declaration.get(
+                'serializer',
+                self.packages[name].config.globals['serializer'])
+
+            package.dependencies.append(Dependency(
+                name, declaration.get('files', []), serializer))
+            self.dependents[name].append(package.name)
+
+    def affected(self, names):
+        "The given packages and all the packages depending on them"
+        affected = set()
+        queue = collections.deque(names)
+
+        while queue:
+            name = queue.popleft()
+            if name in affected:
+                continue
+
+            if name not in self.packages:
+                raise ValueError("Unknown package {}".format(name))
+
+            affected.add(name)
+            queue.extend(self.dependents[name])
+
+        return affected
+
+    def waves(self, names):
+        """The affected packages in topological order.
+
+        The packages of a wave depend only on packages of the previous
+        waves, so they can be bumped in parallel.
+        """
+        affected = self.affected(names)
+
+        pending = dict(
+            (name, set(d.name for d in self.packages[name].dependencies)
+             & affected)
+            for name in affected
+        )
+
+        waves = []
+        while pending:
+            wave = sorted(n for n, deps in pending.items() if not deps)
+            if not wave:
+                raise ValueError(
+                    "The dependencies of the packages {} are cyclic".format(
+                        ", ".join(sorted(pending))))
+
+            for name in wave:
+                del pending[name]
+            for deps in pending.values():
+                deps.difference_update(wave)
+
+            waves.append(wave)
+
+        return waves
+
+    def _plan(self, package, job):
+        version_filepath = os.path.join(package.directory, self.version_file)
+
+        current_version = ver.Version.from_file(
+            version_filepath, package.config.version)
+        if job.part is not None and job.part not in current_version.parts:
+            raise ValueError("Package {} has no version part {}".format(
+                package.name, job.part))
+
+        new_version = self.batch.compute_new_version(
+            job, package.config, current_version)
+
+        return {
+            'version_filepath': version_filepath,
+            'current_version': current_version,
+            'new_version': new_version,
+            'rendered_pairs': rep.RenderedPairs(
+                current_version.as_dict(), new_version.as_dict()),
+        }
+
+    def _use_case(self, plans, version_strings):
+        config_filepath = cfr.find_config_file(self.root)
+        if not os.path.exists(config_filepath):
+            return None
+
+        variables = cfr.load_variables(config_filepath)
+        if variables.get('VCS') is None:
+            return None
+
+        from punch import vcs_configuration as vcsc
+        from punch.vcs_repositories import registry
+        from punch.vcs_use_cases import release as ruc
+
+        names = sorted(plans)
+        vcs_configuration = vcsc.VCSConfiguration.from_dict(
+            variables['VCS'],
+            variables.get('GLOBALS', {}),
+            {
+                'current_version': '+'.join(
+                    '{}-{}'.format(_ref_name(n), version_strings[n][0])
+                    for n in names),
+                'new_version': '+'.join(
+                    '{}-{}'.format(_ref_name(n), version_strings[n][1])
+                    for n in names),
+                'packages': ', '.join(
+                    '{} {} -> {}'.format(n, *version_strings[n])
+                    for n in names),
+            }
+        )
+
+        repo = registry.repo_class(vcs_configuration.name)(
+            os.path.abspath(self.root), vcs_configuration)
+
+        return ruc.VCSReleaseUseCase(repo)
+
+    def _update_pins(self, package, plans):
+        changed_files = []
+
+        for dependency in package.dependencies:
+            # Dependencies that are not bumped keep their pins
+            if dependency.name not in plans:
+                continue
+
+            rendered_pairs = plans[dependency.name]['rendered_pairs']
+            file_configurations = [
+                fc.FileConfiguration(
+                    os.path.join(package.directory, path), {},
+                    {'serializer': dependency.serializer})
+                for path in dependency.files
+            ]
+
+            for result in fu.update_files(file_configurations, rendered_pairs):
+                if result.exception is not None:
+                    raise result.exception
+                if result.updated:
+                    changed_files.append(result.path)
+
+        return changed_files
+
+    def _bump(self, args):
+        index, name, plans, version_strings = args
+        package = self.packages[name]
+        plan = plans[name]
+
+        try:
+            changed_files = self.batch.apply(
+                package.config, plan['rendered_pairs'],
+                plan['version_filepath'], plan['new_version'])
+            changed_files.extend(self._update_pins(package, plans))
+        except Exception as exc:
+            return PackageResult(name, index, None, None, [], exc)
+
+        return PackageResult(
+            name, index, version_strings[name][0], version_strings[name][1],
+            changed_files, None)
+
+    def run(self, names, part=None, set_part=None, reset_on_set=False,
+            action=None, dependents_part=DEFAULT_DEPENDENTS_PART):
+        """Bumps the given packages and their dependents, wave by wave.
+
+        All the new versions are computed before any file is changed,
+        and the whole run is a single VCS release. The run stops after
+        a wave with a failure, and no commit is made: the repository is
+        left as the failed wave found it, on the release branch if one
+        was created, with the files of the completed packages changed.
+        """
+        names = [_normalize(n) for n in names]
+        waves = self.waves(names)
+
+        plans = {}
+        version_strings = {}
+        for wave in waves:
+            for name in wave:
+                package = self.packages[name]
+                if name in names:
+                    job = self._job(package.directory, part, set_part,
+                                    reset_on_set, action)
+                else:
+                    job = self._job(package.directory, dependents_part)
+
+                plans[name] = self._plan(package, job)
+                version_strings[name] = rep.Replacer(
+                    package.config.globals['serializer']).get_pairs(
+                        plans[name]['rendered_pairs'])[0]
+
+        use_case = self._use_case(plans, version_strings)
+        try:
+            for result in self._release(use_case, waves, plans,
+                                        version_strings):
+                yield result
+        finally:
+            # Repositories keep long-lived helper processes
+            if use_case is not None:
+                use_case.close()
+
+    def _release(self, use_case, waves, plans, version_strings):
+        if use_case is not None:
+            use_case.pre_start_release()
+            use_case.start_release()
+
+        pool = None
+        if self.jobs > 1:
+            import multiprocessing.pool
+
+            pool = multiprocessing.pool.ThreadPool(self.jobs)
+
+        changed_files = []
+        failed = False
+        try:
+            for index, wave in enumerate(waves):
+                tasks = [(index, name, plans, version_strings)
+                         for name in wave]
+
+                if pool is None or len(tasks) == 1:
+                    results = [self._bump(task) for task in tasks]
+                else:
+                    results = pool.map(self._bump, tasks)
+
+                for result in results:
+                    failed = failed or result.exception is not None
+                    changed_files.extend(result.changed_files)
+                    yield result
+
+                if failed:
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if use_case is None or failed:
+            return
+
+        use_case.finish_release(
+            changed_files + [plans[n]['version_filepath'] for n in plans])
+        use_case.post_finish_release()
+
+
+def result_to_dict(result):
+    dic = {
+        'package': result.name,
+        'wave': result.wave,
+        'status': 'ok' if result.exception is None else 'error',
+    }
+
+    if result.exception is None:
+        dic['current_version'] = result.current_version
+        dic['new_version'] = result.new_version
+        dic['changed_files'] = result.changed_files
+    else:
+        dic['error'] = "{}: {}".format(
+            result.exception.__class__.__name__, result.exception)
+
+    return dic
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='punch workspace',
+        description="Bumps packages of a workspace and the packages" +
+                    " depending on them."
+    )
+    parser.add_argument('--root', action='store', default=os.curdir,
+                        help="Root directory of the workspace")
+    parser.add_argument('-k', '--package', action='append', required=True,
+                        help="Package to bump, as a path relative to the" +
+                             " root (may be repeated)")
+    parser.add_argument('-p', '--part', action='store')
+    parser.add_argument('--set-part', action='store')
+    parser.add_argument('-a', '--action', action='store')
+    parser.add_argument('--reset-on-set', action='store_true')
+    parser.add_argument('--dependents-part', action='store',
+                        default=DEFAULT_DEPENDENTS_PART,
+                        help="Part bumped on the dependent packages" +
+                             " (default: patch)")
+    parser.add_argument('-j', '--jobs', action='store', type=int, default=1,
+                        help="Number of packages bumped in parallel")
+
+    args = parser.parse_args(args)
+
+    if not any([args.part, args.set_part, args.action]):
+        parser.error("One of --part, --set-part or --action is required")
+
+    failed = False
+    try:
+        workspace = Workspace(args.root, args.jobs)
+        results = workspace.run(
+            args.package, args.part, args.set_part, args.reset_on_set,
+            args.action, args.dependents_part)
+
+        for result in results:
+            failed = failed or result.exception is not None
+            print(json.dumps(result_to_dict(result), sort_keys=True))
+            sys.stdout.flush()
+    except Exception as exc:
+        print("An error occurred while bumping the workspace.")
+        print("Exception {}: {}".format(exc.__class__.__name__, str(exc)))
+        sys.exit(1)
+
+    sys.exit(1 if failed else 0)
@@ -31,6 +31,10 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        # Reading TOML config files before Python 3.11
+        'toml': ['toml'],
+    },
     license="MIT",
     zip_safe=False,
     keywords=['version', 'management'],
@@ -41,3 +41,17 @@ def safe_devnull():
         devnull = subprocess.DEVNULL
 
     return devnull
+
+
+def write_file(path, content):
+    dirpath = os.path.dirname(path)
+    if not os.path.isdir(dirpath):
+        os.makedirs(dirpath)
+
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
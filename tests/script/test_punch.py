@@ -1,3 +1,5 @@
+import json
+import os
 import subprocess
 
 import pytest
@@ -169,3 +171,180 @@ def test_punch_set_and_reset_multiple_parts_fails(test_environment):
     with pytest.raises(subprocess.CalledProcessError):
         test_environment.output(
             ["punch", "--set-part", "major=9,minor=8", "--reset-on-set"])
+
+
+def test_punch_atomic_update(test_environment):
+    test_environment.ensure_file_is_present("README.md", "Version 1.0.0")
+
+    test_environment.ensure_file_is_present(
+        "punch_version.py",
+        "major = 1\nminor = 0\npatch = 0\n"
+    )
+
+    config_file_content = """
+    __config_version__ = 1
+
+    GLOBALS = {
+        'serializer': '{{major}}.{{minor}}.{{patch}}',
+    }
+
+    FILES = ["README.md"]
+
+    VERSION = ['major', 'minor', 'patch']
+    """
+
+    test_environment.ensure_file_is_present(
+        "punch_config.py",
+        config_file_content
+    )
+
+    test_environment.call(["punch", "--part", "minor", "--atomic"])
+
+    assert test_environment.get_file_content("README.md") == "Version 1.1.0"
+    assert test_environment.get_file_content("punch_version.py") == \
+        "major = 1\nminor = 1\npatch = 0\n"
+
+
+@pytest.mark.parametrize('options', [
+    ["--atomic"],
+    ["--jobs", "2"],
+    ["--atomic", "--jobs", "2"],
+])
+def test_punch_update_file_listed_twice(test_environment, options):
+    test_environment.ensure_file_is_present("f.txt", "A1.0.0 B1.0.0")
+
+    test_environment.ensure_file_is_present(
+        "punch_version.py",
+        "major = 1\nminor = 0\npatch = 0\n"
+    )
+
+    config_file_content = """
+    __config_version__ = 1
+
+    GLOBALS = {
+        'serializer': '{{major}}.{{minor}}.{{patch}}',
+    }
+
+    FILES = [
+        {'path': 'f.txt', 'serializer': 'A{{major}}.{{minor}}.{{patch}}'},
+        {'path': 'f.txt', 'serializer': 'B{{major}}.{{minor}}.{{patch}}'},
+    ]
+
+    VERSION = ['major', 'minor', 'patch']
+    """
+
+    test_environment.ensure_file_is_present(
+        "punch_config.py",
+        config_file_content
+    )
+
+    test_environment.call(["punch", "--part", "patch"] + options)
+
+    assert test_environment.get_file_content("f.txt") == "A1.0.1 B1.0.1"
+
+
+def test_punch_import_version_file(test_environment):
+    test_environment.ensure_file_is_present("README.md", "Version 1.4.0")
+
+    test_environment.ensure_file_is_present(
+        "punch_version.py",
+        "major = 1\nminor = 2 * 2\npatch = 0\n"
+    )
+
+    config_file_content = """
+    __config_version__ = 1
+
+    GLOBALS = {
+        'serializer': '{{major}}.{{minor}}.{{patch}}',
+    }
+
+    FILES = ["README.md"]
+
+    VERSION = ['major', 'minor', 'patch']
+    """
+
+    test_environment.ensure_file_is_present(
+        "punch_config.py",
+        config_file_content
+    )
+
+    test_environment.call(
+        ["punch", "--part", "minor", "--import-version-file"])
+
+    assert test_environment.get_file_content("README.md") == "Version 1.5.0"
+    assert test_environment.get_file_content("punch_version.py") == \
+        "major = 1\nminor = 5\npatch = 0\n"
+
+
+def test_punch_with_toml_config(test_environment):
+    test_environment.ensure_file_is_present("README.md", "Version 1.4.0")
+
+    test_environment.ensure_file_is_present(
+        "punch_version.py",
+        "major = 1\nminor = 4\npatch = 0\n"
+    )
+
+    test_environment.ensure_file_is_present(
+        "pyproject.toml",
+        """
+        [tool.punch]
+        config_version = 1
+        files = ["README.md"]
+        version = ["major", "minor", "patch"]
+
+        [tool.punch.globals]
+        serializer = "{{major}}.{{minor}}.{{patch}}"
+        """
+    )
+
+    test_environment.call(["punch", "--part", "minor"])
+
+    assert test_environment.get_file_content("README.md") == "Version 1.5.0"
+
+
+def test_punch_batch(test_environment):
+    for package in ["a", "b"]:
+        os.mkdir(os.path.join(test_environment.path, package))
+        test_environment.ensure_file_is_present(
+            os.path.join(package, "README.md"), "Version 1.4.0")
+        test_environment.ensure_file_is_present(
+            os.path.join(package, "punch_version.py"),
+            "major = 1\nminor = 4\npatch = 0\n"
+        )
+        test_environment.ensure_file_is_present(
+            os.path.join(package, "punch_config.py"),
+            """
+            __config_version__ = 1
+
+            GLOBALS = {
+                'serializer': '{{major}}.{{minor}}.{{patch}}',
+            }
+
+            FILES = ["README.md"]
+
+            VERSION = ['major', 'minor', 'patch']
+            """
+        )
+
+    test_environment.ensure_file_is_present(
+        "manifest.json",
+        """
+        [
+            {"directory": "a", "part": "minor"},
+            {"directory": "b", "part": "major"},
+            {"directory": "c", "part": "major"}
+        ]
+        """
+    )
+
+    ret = test_environment.call(
+        ["punch", "batch", "manifest.json", "--jobs", "2"])
+
+    results = [json.loads(line) for line in ret.stdout.splitlines()]
+
+    assert not ret.success
+    assert [r['status'] for r in results] == ['ok', 'ok', 'error']
+    assert [r.get('new_version') for r in results] == \
+        ['1.5.0', '2.0.0', None]
+    assert test_environment.get_file_content("a/README.md") == \
+        "Version 1.5.0"
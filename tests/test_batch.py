@@ -0,0 +1,153 @@
+import json
+import os
+
+import pytest
+
+from punch import batch
+from tests.conftest import read_file, write_file
+
+config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {
+    'serializer': '{{major}}.{{minor}}.{{patch}}'
+}
+
+FILES = ['README.md', 'src/*.txt']
+
+VERSION = ['major', 'minor', 'patch']
+
+ACTIONS = {
+    'release': {
+        'type': 'conditional_reset',
+        'field': 'patch',
+        'update_fields': ['minor']
+    }
+}
+"""
+
+
+@pytest.fixture
+def packages(temp_empty_dir):
+    for name, version in [('a', '1.2.3'), ('b', '0.1.0')]:
+        package_dir = os.path.join(temp_empty_dir, name)
+        major, minor, patch = version.split('.')
+
+        write_file(os.path.join(package_dir, 'punch_config.py'),
+                   config_file_content)
+        write_file(os.path.join(package_dir, 'punch_version.py'),
+                   "major = {}\nminor = {}\npatch = {}\n".format(
+                       major, minor, patch))
+        write_file(os.path.join(package_dir, 'README.md'),
+                   "Version " + version)
+        write_file(os.path.join(package_dir, 'src', 'version.txt'), version)
+
+    return temp_empty_dir
+
+
+def test_job_from_dict():
+    job = batch.Job.from_dict({'directory': 'a', 'part': 'minor'}, 'root')
+
+    assert job.directory == os.path.join('root', 'a')
+    assert job.version_file == 'punch_version.py'
+    assert job.config_file is None
+
+
+def test_job_from_dict_without_update():
+    with pytest.raises(ValueError):
+        batch.Job.from_dict({'directory': 'a'})
+
+
+def test_job_from_dict_with_unknown_keys():
+    with pytest.raises(ValueError):
+        batch.Job.from_dict({'part': 'minor', 'parts': 'major'})
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_run(packages, concurrency):
+    jobs = [
+        batch.Job.from_dict({'directory': 'a', 'part': 'minor'}, packages),
+        batch.Job.from_dict({'directory': 'b', 'set_part': 'major=1'},
+                            packages),
+    ]
+
+    results = list(batch.run(jobs, concurrency))
+
+    assert [(r.current_version, r.new_version) for r in results] == \
+        [('1.2.3', '1.3.0'), ('0.1.0', '1.1.0')]
+    assert results[0].changed_files == [
+        os.path.join(packages, 'a', 'README.md'),
+        os.path.join(packages, 'a', 'src/version.txt'),
+    ]
+    assert read_file(os.path.join(packages, 'a', 'README.md')) == \
+        "Version 1.3.0"
+    assert read_file(os.path.join(packages, 'b', 'src', 'version.txt')) == \
+        "1.1.0"
+    assert read_file(os.path.join(packages, 'b', 'punch_version.py')) == \
+        "major = 1\nminor = 1\npatch = 0\n"
+
+
+def test_run_action(packages):
+    job = batch.Job.from_dict({'directory': 'a', 'action': 'release'},
+                              packages)
+
+    result = list(batch.run([job]))[0]
+
+    assert result.new_version == '1.3.0'
+
+
+def test_run_reports_errors_per_job(packages):
+    jobs = [
+        batch.Job.from_dict({'directory': 'missing', 'part': 'minor'},
+                            packages),
+        batch.Job.from_dict({'directory': 'b', 'part': 'patch'}, packages),
+    ]
+
+    results = list(batch.run(jobs))
+
+    assert results[0].exception is not None
+    assert results[1].exception is None
+    assert results[1].new_version == '0.1.1'
+
+
+def test_run_closes_repository_on_failure(packages, mocker):
+    with open(os.path.join(packages, 'a', 'punch_config.py'), 'a') as f:
+        f.write("\nVCS = {'name': 'git'}\n")
+
+    use_case = mocker.Mock()
+    use_case.start_release.side_effect = ValueError("Dirty repository")
+    mocker.patch.object(batch.Batch, '_use_case', return_value=use_case)
+
+    job = batch.Job.from_dict({'directory': 'a', 'part': 'minor'}, packages)
+    result = list(batch.run([job]))[0]
+
+    assert isinstance(result.exception, ValueError)
+    assert use_case.close.called
+
+
+def test_result_to_dict(packages):
+    jobs = [
+        batch.Job.from_dict({'directory': 'b', 'part': 'patch'}, packages),
+        batch.Job.from_dict({'directory': 'b', 'part': 'nothing'}, packages),
+    ]
+
+    results = list(batch.run(jobs))
+
+    assert batch.result_to_dict(0, results[0])['status'] == 'ok'
+    assert batch.result_to_dict(0, results[0])['new_version'] == '0.1.1'
+    assert batch.result_to_dict(1, results[1])['status'] == 'error'
+    assert 'KeyError' in batch.result_to_dict(1, results[1])['error']
+
+
+def test_load_manifest(temp_empty_dir):
+    manifest_path = os.path.join(temp_empty_dir, 'manifest.json')
+    write_file(manifest_path, json.dumps({'jobs': [
+        {'directory': 'a', 'part': 'minor'},
+        {'directory': 'b', 'version_file': 'version.py', 'part': 'major'},
+    ]}))
+
+    jobs = batch.load_manifest(manifest_path)
+
+    assert [j.directory for j in jobs] == [
+        os.path.join(temp_empty_dir, 'a'), os.path.join(temp_empty_dir, 'b')]
+    assert jobs[1].version_file == 'version.py'
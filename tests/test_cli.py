@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules that the CLI shall not import before they are actually needed
+HEAVY_MODULES = [
+    'jinja2',
+    'six',
+    'json',
+    'subprocess',
+    'tempfile',
+    'multiprocessing',
+    'punch.config',
+    'punch.file_updater',
+    'punch.replacer',
+    'punch.templates',
+    'punch.transaction',
+    'punch.vcs_repositories.git_repo',
+]
+
+IMPORTED_MODULES_SCRIPT = """
+import sys
+sys.argv = ['punch'] + sys.argv[1:]
+
+import punch.cli
+
+if len(sys.argv) > 1:
+    try:
+        punch.cli.main()
+    except SystemExit:
+        pass
+
+sys.stderr.write(" ".join(m for m in {modules!r} if m in sys.modules))
+"""
+
+
+def imported_heavy_modules(args, cwd=None):
+    script = IMPORTED_MODULES_SCRIPT.format(modules=HEAVY_MODULES)
+    p = subprocess.Popen(
+        [sys.executable, '-c', script] + list(args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd
+    )
+    stdout, stderr = p.communicate()
+
+    return stderr.decode('utf8').split()
+
+
+def test_import_cli_does_not_import_heavy_modules():
+    assert imported_heavy_modules([]) == []
+
+
+@pytest.mark.parametrize('args', [
+    ['--version'],
+    ['--help'],
+])
+def test_informative_options_do_not_import_heavy_modules(args):
+    assert imported_heavy_modules(args) == []
+
+
+def test_init_does_not_import_heavy_modules(temp_empty_dir):
+    assert imported_heavy_modules(['--init'], temp_empty_dir) == []
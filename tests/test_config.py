@@ -316,3 +316,299 @@ def test_read_actions(temp_empty_dir, config_file_content_with_actions,
     }
 
     assert cf.actions == expected_value
+
+
+def test_read_files_with_patterns(temp_empty_dir, monkeypatch,
+                                  config_file_name, version_file_content,
+                                  version_file_name):
+    clean_previous_imports()
+
+    config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {
+    'serializer': '{{major}}.{{minor}}.{{patch}}'
+}
+
+FILES = [
+    'pkg*/version.txt',
+    {
+        'path': '**/setup.py',
+        'serializer': '{{major}}.{{minor}}'
+    }
+]
+
+FILES_IGNORE = ['pkg2']
+
+VERSION = ['major', 'minor', 'patch']
+"""
+
+    for path in ['pkg1/version.txt', 'pkg2/version.txt', 'pkg1/setup.py']:
+        dirpath = os.path.join(temp_empty_dir, os.path.dirname(path))
+        if not os.path.isdir(dirpath):
+            os.makedirs(dirpath)
+        write_file(temp_empty_dir, "", path)
+
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    write_file(temp_empty_dir, version_file_content, version_file_name)
+
+    monkeypatch.chdir(temp_empty_dir)
+    cf = pc.PunchConfig(config_file_name)
+
+    assert [f.path for f in cf.files] == ['pkg1/version.txt', 'pkg1/setup.py']
+    assert cf.files[1].config['serializer'] == '{{ major }}.{{ minor }}'
+
+
+def test_read_config_from_cache(temp_empty_dir, config_file_content,
+                                config_file_name, mocker):
+    clean_previous_imports()
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    config_filepath = os.path.join(temp_empty_dir, config_file_name)
+    cache_path = os.path.join(temp_empty_dir, '.cache', 'config')
+
+    cf = pc.PunchConfig(config_filepath, cache_path)
+
+    import_file = mocker.patch('punch.config.import_file')
+    cached_cf = pc.PunchConfig(config_filepath, cache_path)
+
+    assert not import_file.called
+    assert cached_cf.globals == cf.globals
+    assert cached_cf.version == cf.version
+    assert [(f.path, f.config) for f in cached_cf.files] == \
+        [(f.path, f.config) for f in cf.files]
+
+
+def test_config_cache_is_invalidated_by_changes(
+        temp_empty_dir, config_file_content, config_file_name):
+    clean_previous_imports()
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    config_filepath = os.path.join(temp_empty_dir, config_file_name)
+    cache_path = os.path.join(temp_empty_dir, 'config_cache')
+
+    pc.PunchConfig(config_filepath, cache_path)
+
+    clean_previous_imports()
+    write_file(temp_empty_dir,
+               config_file_content.replace("'pkg/__init__.py',", ""),
+               config_file_name)
+    cf = pc.PunchConfig(config_filepath, cache_path)
+
+    assert [f.path for f in cf.files] == ['version.txt']
+
+
+def test_corrupted_config_cache_is_ignored(
+        temp_empty_dir, config_file_content, config_file_name):
+    clean_previous_imports()
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    write_file(temp_empty_dir, "not a cache", 'config_cache')
+
+    cf = pc.PunchConfig(os.path.join(temp_empty_dir, config_file_name),
+                        os.path.join(temp_empty_dir, 'config_cache'))
+
+    assert cf.globals['serializer'] == '{{major}}.{{minor}}.{{patch}}'
+
+
+def test_cached_config_expands_patterns_again(temp_empty_dir, monkeypatch,
+                                              config_file_name):
+    clean_previous_imports()
+
+    config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {
+    'serializer': '{{major}}.{{minor}}.{{patch}}'
+}
+
+FILES = ['pkg*/version.txt']
+
+VERSION = ['major', 'minor', 'patch']
+"""
+
+    os.mkdir(os.path.join(temp_empty_dir, 'pkg1'))
+    write_file(temp_empty_dir, "", 'pkg1/version.txt')
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    monkeypatch.chdir(temp_empty_dir)
+
+    pc.PunchConfig(config_file_name, 'config_cache')
+
+    os.mkdir(os.path.join(temp_empty_dir, 'pkg2'))
+    write_file(temp_empty_dir, "", 'pkg2/version.txt')
+    cf = pc.PunchConfig(config_file_name, 'config_cache')
+
+    assert [f.path for f in cf.files] == \
+        ['pkg1/version.txt', 'pkg2/version.txt']
+
+
+toml_config_file_content = """
+config_version = 1
+files = [
+    "pkg/__init__.py",
+    {path = "version.txt", serializer = "{{major}}.{{minor}}"},
+]
+version = ["major", "minor", {name = "patch", type = "integer"}]
+
+[globals]
+serializer = "{{major}}.{{minor}}.{{patch}}"
+
+[vcs]
+name = "git"
+commit_message = "Version updated to {{ new_version }}"
+
+[actions.mbuild]
+type = "refresh"
+refresh_fields = ["year", "month"]
+fallback_field = "build"
+"""
+
+
+def check_declarative_config(cf):
+    assert cf.__config_version__ == 1
+    assert cf.globals == {'serializer': '{{major}}.{{minor}}.{{patch}}'}
+    assert [f.path for f in cf.files] == ['pkg/__init__.py', 'version.txt']
+    assert cf.files[1].config['serializer'] == '{{ major }}.{{ minor }}'
+    assert cf.version == [
+        'major', 'minor', {'name': 'patch', 'type': 'integer'}]
+    assert cf.vcs['name'] == 'git'
+    assert cf.actions['mbuild']['fallback_field'] == 'build'
+
+
+def test_read_toml_config(temp_empty_dir):
+    write_file(temp_empty_dir, toml_config_file_content, 'punch.toml')
+
+    check_declarative_config(
+        pc.PunchConfig(os.path.join(temp_empty_dir, 'punch.toml')))
+
+
+def test_read_pyproject_config(temp_empty_dir):
+    content = """
+[project]
+name = "example"
+
+[tool.punch]
+config_version = 1
+files = [
+    "pkg/__init__.py",
+    {path = "version.txt", serializer = "{{major}}.{{minor}}"},
+]
+version = ["major", "minor", {name = "patch", type = "integer"}]
+
+[tool.punch.globals]
+serializer = "{{major}}.{{minor}}.{{patch}}"
+
+[tool.punch.vcs]
+name = "git"
+
+[tool.punch.actions.mbuild]
+type = "refresh"
+fallback_field = "build"
+"""
+    write_file(temp_empty_dir, content, 'pyproject.toml')
+
+    check_declarative_config(
+        pc.PunchConfig(os.path.join(temp_empty_dir, 'pyproject.toml')))
+
+
+def test_read_json_config(temp_empty_dir):
+    content = """{
+    "config_version": 1,
+    "globals": {"serializer": "{{major}}.{{minor}}.{{patch}}"},
+    "files": ["pkg/__init__.py",
+              {"path": "version.txt", "serializer": "{{major}}.{{minor}}"}],
+    "version": ["major", "minor", {"name": "patch", "type": "integer"}],
+    "vcs": {"name": "git"},
+    "actions": {"mbuild": {"type": "refresh", "fallback_field": "build"}}
+}
+"""
+    write_file(temp_empty_dir, content, 'punch.json')
+
+    check_declarative_config(
+        pc.PunchConfig(os.path.join(temp_empty_dir, 'punch.json')))
+
+
+def test_read_invalid_toml_config(temp_empty_dir):
+    write_file(temp_empty_dir, "config_version = ", 'punch.toml')
+
+    with pytest.raises(ValueError):
+        pc.PunchConfig(os.path.join(temp_empty_dir, 'punch.toml'))
+
+
+def test_read_declarative_config_missing_files(temp_empty_dir):
+    write_file(temp_empty_dir, "config_version = 1\n", 'punch.toml')
+
+    with pytest.raises(ValueError) as exc:
+        pc.PunchConfig(os.path.join(temp_empty_dir, 'punch.toml'))
+
+    assert "FILES" in str(exc.value)
+
+
+def test_find_config_file(temp_empty_dir):
+    assert pc.find_config_file(temp_empty_dir) == \
+        os.path.join(temp_empty_dir, 'punch_config.py')
+
+    write_file(temp_empty_dir, '[project]\nname = "example"\n',
+               'pyproject.toml')
+    assert pc.find_config_file(temp_empty_dir) == \
+        os.path.join(temp_empty_dir, 'punch_config.py')
+
+    write_file(temp_empty_dir, '[tool.punch]\nconfig_version = 1\n',
+               'pyproject.toml')
+    assert pc.find_config_file(temp_empty_dir) == \
+        os.path.join(temp_empty_dir, 'pyproject.toml')
+
+    write_file(temp_empty_dir, toml_config_file_content, 'punch.toml')
+    assert pc.find_config_file(temp_empty_dir) == \
+        os.path.join(temp_empty_dir, 'punch.toml')
+
+    write_file(temp_empty_dir, "", 'punch_config.py')
+    assert pc.find_config_file(temp_empty_dir) == \
+        os.path.join(temp_empty_dir, 'punch_config.py')
+
+
+def test_read_files_with_glob_characters_in_existing_paths(
+        temp_empty_dir, monkeypatch, config_file_name):
+    clean_previous_imports()
+
+    config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {
+    'serializer': '{{major}}.{{minor}}.{{patch}}'
+}
+
+FILES = ['app/[slug]/v.ts', 'version.txt']
+
+VERSION = ['major', 'minor', 'patch']
+"""
+
+    os.makedirs(os.path.join(temp_empty_dir, 'app', '[slug]'))
+    write_file(temp_empty_dir, "", 'app/[slug]/v.ts')
+    write_file(temp_empty_dir, "", 'version.txt')
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    monkeypatch.chdir(temp_empty_dir)
+
+    cf = pc.PunchConfig(config_file_name)
+
+    assert [f.path for f in cf.files] == ['app/[slug]/v.ts', 'version.txt']
+
+
+def test_read_files_with_pattern_matching_nothing(
+        temp_empty_dir, monkeypatch, config_file_name):
+    clean_previous_imports()
+
+    config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {
+    'serializer': '{{major}}.{{minor}}.{{patch}}'
+}
+
+FILES = ['pkg*/version.txt']
+
+VERSION = ['major', 'minor', 'patch']
+"""
+
+    write_file(temp_empty_dir, config_file_content, config_file_name)
+    monkeypatch.chdir(temp_empty_dir)
+
+    with pytest.raises(ValueError):
+        pc.PunchConfig(config_file_name)
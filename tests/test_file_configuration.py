@@ -101,3 +101,13 @@ def test_file_conf_fr_dict_path_cannot_be_overridden_by_global_variables(
     )
 
     assert fconf.path == 'pkg/__init__.py'
+
+
+def test_file_configuration_keeps_non_string_local_variables(
+        global_variables):
+    fconf = fc.FileConfiguration.from_dict(
+        {'path': 'dist/bundle.js', 'streaming_threshold': 1048576},
+        global_variables
+    )
+
+    assert fconf.config['streaming_threshold'] == 1048576
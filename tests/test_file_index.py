@@ -0,0 +1,109 @@
+import os
+import time
+
+import pytest
+
+from punch import file_index as fi
+
+
+@pytest.fixture
+def temp_dir_with_tree(temp_empty_dir):
+    for path in [
+        'version.txt',
+        'packages/a/pyproject.toml',
+        'packages/a/version.txt',
+        'packages/b/pyproject.toml',
+        'packages/b/deep/version.txt',
+        'node_modules/c/version.txt',
+        'build/version.txt',
+    ]:
+        fullpath = os.path.join(temp_empty_dir, *path.split('/'))
+        if not os.path.isdir(os.path.dirname(fullpath)):
+            os.makedirs(os.path.dirname(fullpath))
+        with open(fullpath, 'w') as f:
+            f.write("1.0.0")
+
+    return temp_empty_dir
+
+
+def test_is_pattern():
+    assert fi.is_pattern('packages/*/pyproject.toml')
+    assert fi.is_pattern('version.tx?')
+    assert fi.is_pattern('version.[tc]xt')
+    assert not fi.is_pattern('packages/a/pyproject.toml')
+
+
+def test_compile_pattern():
+    regex = fi.compile_pattern('**/version.txt')
+
+    assert regex.match('version.txt')
+    assert regex.match('a/b/version.txt')
+    assert not regex.match('a/b/version.txt.bak')
+
+    regex = fi.compile_pattern('packages/*/pyproject.toml')
+
+    assert regex.match('packages/a/pyproject.toml')
+    assert not regex.match('packages/a/b/pyproject.toml')
+
+    regex = fi.compile_pattern('v[!0-9].txt')
+
+    assert regex.match('va.txt')
+    assert not regex.match('v1.txt')
+
+
+def test_expand_single_level(temp_dir_with_tree):
+    index = fi.FileIndex(temp_dir_with_tree)
+
+    assert index.expand('packages/*/pyproject.toml') == [
+        'packages/a/pyproject.toml',
+        'packages/b/pyproject.toml',
+    ]
+
+
+def test_expand_recursive_with_ignore_rules(temp_dir_with_tree):
+    index = fi.FileIndex(
+        temp_dir_with_tree, ignore=['node_modules', 'build/**'])
+
+    assert index.expand('**/version.txt') == [
+        'packages/a/version.txt',
+        'packages/b/deep/version.txt',
+        'version.txt',
+    ]
+
+
+def test_ignored_directories_are_not_walked(mocker, temp_dir_with_tree):
+    index = fi.FileIndex(temp_dir_with_tree, ignore=['node_modules'])
+    listdir = mocker.spy(index, 'listdir')
+
+    index.expand('**/version.txt')
+
+    walked = [c[0][0] for c in listdir.call_args_list]
+    assert 'node_modules' not in walked
+    assert 'packages/a' in walked
+
+
+def test_cache_avoids_scanning_unchanged_directories(
+        mocker, temp_dir_with_tree):
+    os.mkdir(os.path.join(temp_dir_with_tree, '.cache'))
+    cache_path = os.path.join(temp_dir_with_tree, '.cache', 'index.json')
+
+    # Directories modified just before the scan are not trusted
+    past = time.time() - 10
+    for dirpath, dirnames, filenames in os.walk(temp_dir_with_tree):
+        os.utime(dirpath, (past, past))
+
+    index = fi.FileIndex(
+        temp_dir_with_tree, ignore=['.cache'], cache_path=cache_path)
+    index.expand('**/version.txt')
+    index.save()
+
+    index = fi.FileIndex(
+        temp_dir_with_tree, ignore=['.cache'], cache_path=cache_path)
+    scan = mocker.spy(index, '_scan')
+    assert len(index.expand('**/version.txt')) == 5
+    assert scan.call_count == 0
+
+    os.remove(os.path.join(temp_dir_with_tree, 'packages', 'a', 'version.txt'))
+
+    assert len(index.expand('**/version.txt')) == 4
+    assert scan.call_count == 1
@@ -1,6 +1,7 @@
 # coding: utf-8
 
 import os
+import time
 import pytest
 import six
 from punch import file_configuration as fc
@@ -175,3 +176,259 @@ def test_file_updater_preview(temp_empty_dir):
     summary = updater.get_summary(current_version, new_version)
 
     assert summary == [("__version__ = \"1.2\"", "__version__ = \"1.3\"")]
+
+
+def test_file_updater_streaming(temp_empty_dir):
+    filepath = os.path.join(temp_empty_dir, "__init__.py")
+    with open(filepath, 'w') as f:
+        f.write("__version__ = \"1.2.3\"\n" * 100)
+
+    current_version = {
+        'major': 1,
+        'minor': 2,
+        'patch': 3
+    }
+    new_version = {
+        'major': 1,
+        'minor': 2,
+        'patch': 4
+    }
+
+    local_variables = {
+        'serializer': "__version__ = \"{{major}}.{{minor}}.{{patch}}\"",
+        'streaming_threshold': "0"
+    }
+
+    file_config = fc.FileConfiguration(filepath, local_variables)
+
+    updater = fu.FileUpdater(file_config)
+    assert updater.streaming_threshold == 0
+    updater.update(current_version, new_version)
+
+    with open(filepath, 'r') as f:
+        new_file_content = f.read()
+
+    assert new_file_content == "__version__ = \"1.2.4\"\n" * 100
+    assert os.listdir(temp_empty_dir) == ["__init__.py"]
+
+
+def test_file_updater_skips_files_without_current_version(
+        temp_dir_with_version_file):
+    filepath = os.path.join(temp_dir_with_version_file, "__init__.py")
+    os.utime(filepath, (0, 0))
+
+    current_version = {
+        'major': 1,
+        'minor': 3,
+        'patch': 0
+    }
+    new_version = {
+        'major': 1,
+        'minor': 3,
+        'patch': 1
+    }
+
+    local_variables = {
+        'serializer': "__version__ = \"{{major}}.{{minor}}.{{patch}}\""
+    }
+
+    file_config = fc.FileConfiguration(filepath, local_variables)
+
+    updater = fu.FileUpdater(file_config)
+
+    assert updater.update(current_version, new_version) is False
+    assert os.path.getmtime(filepath) == 0
+
+
+def test_file_contains_any(temp_dir_with_unicode_version_file):
+    filepath = os.path.join(temp_dir_with_unicode_version_file, "__init__.py")
+
+    assert fu.file_contains_any(filepath, [u"1.2.3"])
+    assert fu.file_contains_any(filepath, [u"0.0.0", u"version⚠"])
+    assert not fu.file_contains_any(filepath, [u"1.2.4"])
+    assert not fu.file_contains_any(filepath, [])
+
+
+def test_file_updater_does_not_rewrite_unchanged_files(
+        temp_dir_with_version_file):
+    filepath = os.path.join(temp_dir_with_version_file, "__init__.py")
+    os.utime(filepath, (0, 0))
+
+    current_version = {
+        'major': 1,
+        'minor': 3,
+        'patch': 0
+    }
+    new_version = {
+        'major': 1,
+        'minor': 3,
+        'patch': 1
+    }
+
+    # Patterns with newlines cannot be pre-checked, so the file is read
+    local_variables = {
+        'serializer': "version\n{{major}}.{{minor}}.{{patch}}"
+    }
+
+    file_config = fc.FileConfiguration(filepath, local_variables)
+
+    updater = fu.FileUpdater(file_config)
+
+    assert updater.update(current_version, new_version) is False
+    assert os.path.getmtime(filepath) == 0
+
+
+def test_file_updater_streaming_does_not_rewrite_unchanged_files(
+        temp_dir_with_version_file):
+    filepath = os.path.join(temp_dir_with_version_file, "__init__.py")
+    os.utime(filepath, (0, 0))
+
+    rendered_pairs = fu.replacer.RenderedPairs(
+        {'major': 1, 'minor': 3, 'patch': 0},
+        {'major': 1, 'minor': 3, 'patch': 1}
+    )
+
+    local_variables = {
+        'serializer': "{{major}}.{{minor}}.{{patch}}"
+    }
+
+    file_config = fc.FileConfiguration(filepath, local_variables)
+
+    updater = fu.FileUpdater(file_config)
+
+    assert updater.update_rendered_stream(rendered_pairs) is False
+    assert os.path.getmtime(filepath) == 0
+    assert os.listdir(temp_dir_with_version_file) == ["__init__.py"]
+
+
+@pytest.mark.parametrize('jobs, use_processes', [
+    (1, False),
+    (3, False),
+    (3, True),
+])
+def test_update_files(temp_empty_dir, jobs, use_processes):
+    file_configs = []
+    for i in range(6):
+        filepath = os.path.join(temp_empty_dir, "file{}.txt".format(i))
+        if i != 4:
+            with open(filepath, 'w') as f:
+                f.write("Version 1.2.3" if i % 2 == 0 else "Nothing here")
+
+        file_configs.append(fc.FileConfiguration(
+            filepath, {'serializer': "{{major}}.{{minor}}.{{patch}}"}))
+
+    rendered_pairs = fu.replacer.RenderedPairs(
+        {'major': 1, 'minor': 2, 'patch': 3},
+        {'major': 1, 'minor': 2, 'patch': 4}
+    )
+
+    results = list(fu.update_files(
+        file_configs, rendered_pairs, jobs, use_processes))
+
+    assert [r.path for r in results] == [c.path for c in file_configs]
+    assert [r.updated for r in results] == \
+        [True, False, True, False, False, False]
+    assert [r.exception is None for r in results] == \
+        [True, True, True, True, False, True]
+
+    with open(file_configs[2].path, 'r') as f:
+        assert f.read() == "Version 1.2.4"
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_update_files_with_duplicated_paths(temp_empty_dir, jobs):
+    filepath = os.path.join(temp_empty_dir, "f.txt")
+    other_filepath = os.path.join(temp_empty_dir, "g.txt")
+    for path in [filepath, other_filepath]:
+        with open(path, 'w') as f:
+            f.write("A1.0.0 B1.0.0")
+
+    file_configs = [
+        fc.FileConfiguration(
+            filepath, {'serializer': "A{{major}}.{{minor}}.{{patch}}"}),
+        fc.FileConfiguration(
+            other_filepath, {'serializer': "A{{major}}.{{minor}}.{{patch}}"}),
+        fc.FileConfiguration(
+            filepath, {'serializer': "B{{major}}.{{minor}}.{{patch}}"}),
+    ]
+
+    rendered_pairs = fu.replacer.RenderedPairs(
+        {'major': 1, 'minor': 0, 'patch': 0},
+        {'major': 1, 'minor': 0, 'patch': 1}
+    )
+
+    results = list(fu.update_files(file_configs, rendered_pairs, jobs))
+
+    assert [r.path for r in results] == [c.path for c in file_configs]
+    assert all(r.updated for r in results)
+
+    with open(filepath, 'r') as f:
+        assert f.read() == "A1.0.1 B1.0.1"
+
+
+def test_update_files_never_updates_a_file_concurrently(
+        temp_empty_dir, monkeypatch):
+    filepath = os.path.join(temp_empty_dir, "f.txt")
+    with open(filepath, 'w') as f:
+        f.write("A1.0.0 B1.0.0")
+
+    active = set()
+    overlapping = []
+    update_file = fu._update_file
+
+    def slow_update_file(args):
+        path = args[0].path
+        if path in active:
+            overlapping.append(path)
+        active.add(path)
+        time.sleep(0.05)
+        try:
+            return update_file(args)
+        finally:
+            active.discard(path)
+
+    monkeypatch.setattr(fu, '_update_file', slow_update_file)
+
+    file_configs = [
+        fc.FileConfiguration(filepath, {'serializer': "A{{major}}"}),
+        fc.FileConfiguration(filepath, {'serializer': "B{{major}}"}),
+    ]
+    rendered_pairs = fu.replacer.RenderedPairs({'major': 1}, {'major': 2})
+
+    list(fu.update_files(file_configs, rendered_pairs, 2))
+
+    assert overlapping == []
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_update_files_staged_with_duplicated_paths(temp_empty_dir, jobs):
+    filepath = os.path.join(temp_empty_dir, "f.txt")
+    with open(filepath, 'w') as f:
+        f.write("A1.0.0 B1.0.0")
+
+    file_configs = [
+        fc.FileConfiguration(
+            filepath, {'serializer': "A{{major}}.{{minor}}.{{patch}}"}),
+        fc.FileConfiguration(
+            filepath, {'serializer': "B{{major}}.{{minor}}.{{patch}}"}),
+    ]
+
+    rendered_pairs = fu.replacer.RenderedPairs(
+        {'major': 1, 'minor': 0, 'patch': 0},
+        {'major': 1, 'minor': 0, 'patch': 1}
+    )
+
+    results = list(fu.update_files(
+        file_configs, rendered_pairs, jobs, staged=True))
+
+    assert [r.path for r in results] == [filepath, filepath]
+    assert all(r.updated for r in results)
+
+    # The file is staged once, with the changes of both entries
+    staged_paths = [r.staged_path for r in results if r.staged_path]
+    assert len(staged_paths) == 1
+
+    with open(staged_paths[0], 'r') as f:
+        assert f.read() == "A1.0.1 B1.0.1"
+    with open(filepath, 'r') as f:
+        assert f.read() == "A1.0.0 B1.0.0"
@@ -179,3 +179,191 @@ def test_replace_content_without_using_all_parts():
     new_file_content = rep.replace(file_content, current_version, new_version)
 
     assert new_file_content == updated_file_content
+
+
+def test_rendered_pairs_render_each_serializer_once(mocker):
+    current_version = {
+        'major': 1,
+        'minor': 0,
+        'patch': 0
+    }
+    new_version = {
+        'major': 1,
+        'minor': 0,
+        'patch': 1
+    }
+
+    serializer = "__version__ = \"{{major}}.{{minor}}.{{patch}}\""
+    rendered_pairs = replacer.RenderedPairs(current_version, new_version)
+
+    mock_get_template = mocker.patch(
+        'punch.templates.get_template',
+        wraps=replacer.templates.get_template
+    )
+
+    for i in range(3):
+        rep = replacer.Replacer(serializer)
+        new_file_content = rep.replace_rendered(
+            "__version__ = \"1.0.0\"", rendered_pairs)
+
+    assert new_file_content == "__version__ = \"1.0.1\""
+    assert mock_get_template.call_count == 1
+    assert len(rendered_pairs) == 1
+
+
+def test_replace_content_with_overlapping_serializers_first_policy():
+    current_version = {
+        'major': 1,
+        'minor': 2,
+        'patch': 3
+    }
+    new_version = {
+        'major': 1,
+        'minor': 3,
+        'patch': 0
+    }
+
+    serializers = [
+        "{{major}}.{{minor}}",
+        "{{major}}.{{minor}}.{{patch}}"
+    ]
+
+    rep = replacer.Replacer(serializers)
+
+    new_file_content = rep.replace(
+        "Short 1.2, long 1.2.3", current_version, new_version)
+
+    assert new_file_content == "Short 1.3, long 1.3.3"
+
+
+def test_replace_content_with_overlapping_serializers_longest_policy():
+    current_version = {
+        'major': 1,
+        'minor': 2,
+        'patch': 3
+    }
+    new_version = {
+        'major': 1,
+        'minor': 3,
+        'patch': 0
+    }
+
+    serializers = [
+        "{{major}}.{{minor}}",
+        "{{major}}.{{minor}}.{{patch}}"
+    ]
+
+    rep = replacer.Replacer(serializers, 'longest')
+
+    new_file_content = rep.replace(
+        "Short 1.2, long 1.2.3", current_version, new_version)
+
+    assert new_file_content == "Short 1.3, long 1.3.0"
+
+
+@pytest.mark.parametrize('conflict_policy, expected', [
+    ('first', "1.2.5 1.2.5"),
+    ('longest', "1.2.4 1.2.5"),
+])
+def test_replace_chained_patterns(conflict_policy, expected):
+    multi_replacer = replacer.MultiReplacer([
+        ("1.2.3", "1.2.4"),
+        ("1.2.4", "1.2.5")
+    ], conflict_policy)
+
+    assert multi_replacer.replace("1.2.3 1.2.4") == expected
+
+
+def sequential_replace(text, pairs):
+    for search_pattern, replace_pattern in pairs:
+        text = text.replace(search_pattern, replace_pattern)
+    return text
+
+
+@pytest.mark.parametrize('serializers', [
+    ["{{minor}}.{{patch}}", "{{major}}.{{minor}}"],
+    ["{{major}}.{{minor}}", "{{major}}.{{minor}}.{{patch}}"],
+    ["{{major}}.{{minor}}.{{patch}}", "{{major}}.{{minor}}"],
+    ["v{{major}}.{{minor}}.{{patch}}", "version {{major}}"],
+    ["{{patch}}", "{{major}}.{{minor}}.{{patch}}"],
+])
+@pytest.mark.parametrize('chunk_size', [1, 3, 64])
+def test_first_policy_replaces_like_sequential_passes(serializers,
+                                                      chunk_size):
+    rendered_pairs = replacer.RenderedPairs(
+        {'major': 1, 'minor': 2, 'patch': 3},
+        {'major': 1, 'minor': 3, 'patch': 0}
+    )
+    pairs = [rendered_pairs.get(s) for s in serializers]
+    multi_replacer = replacer.MultiReplacer(pairs)
+
+    text = "v1.2.3 and 1.2, version 1 with 2.3 3 1.2.3.3"
+
+    destination = file_like("")
+    multi_replacer.replace_stream(file_like(text), destination, chunk_size)
+
+    assert multi_replacer.replace(text) == sequential_replace(text, pairs)
+    assert destination.getvalue() == sequential_replace(text, pairs)
+
+
+def test_first_policy_replaces_versions_like_sequential_passes():
+    rep = replacer.Replacer(["{{minor}}.{{patch}}", "{{major}}.{{minor}}"])
+
+    new_file_content = rep.replace(
+        "v1.2.3",
+        {'major': 1, 'minor': 2, 'patch': 3},
+        {'major': 1, 'minor': 3, 'patch': 0}
+    )
+
+    assert new_file_content == "v1.3.0"
+
+
+def test_first_policy_uses_single_scan_for_independent_patterns():
+    multi_replacer = replacer.MultiReplacer([
+        ("version = '1.2.3'", "version = '1.2.4'"),
+        ("release 1.2", "release 1.3")
+    ])
+
+    assert not multi_replacer.sequential
+
+
+def test_multi_replacer_skips_empty_and_unchanged_patterns():
+    multi_replacer = replacer.MultiReplacer([
+        ("", "x"),
+        ("1.0", "1.0"),
+        ("1.0.0", "1.0.1")
+    ])
+
+    assert list(multi_replacer.replacements.items()) == [("1.0.0", "1.0.1")]
+    assert multi_replacer.replace("1.0.0") == "1.0.1"
+
+
+def test_multi_replacer_unknown_conflict_policy():
+    with pytest.raises(ValueError):
+        replacer.MultiReplacer([("1.0.0", "1.0.1")], 'shortest')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize('conflict_policy', ['first', 'longest'])
+def test_multi_replacer_stream_matches_replace(chunk_size, conflict_policy):
+    multi_replacer = replacer.MultiReplacer([
+        ("1.2", "1.3"),
+        ("1.2.3", "1.3.0"),
+        ("version", "release")
+    ], conflict_policy)
+
+    text = "version 1.2.3\n1.2 and 1.2.3.4 versions 1.1.2.3 1.2"
+
+    destination = file_like("")
+    multi_replacer.replace_stream(file_like(text), destination, chunk_size)
+
+    assert destination.getvalue() == multi_replacer.replace(text)
+
+
+def test_multi_replacer_stream_without_replacements():
+    multi_replacer = replacer.MultiReplacer([("1.0", "1.0")])
+
+    destination = file_like("")
+    multi_replacer.replace_stream(file_like("1.0 text"), destination, 2)
+
+    assert destination.getvalue() == "1.0 text"
@@ -0,0 +1,88 @@
+import pytest
+
+from punch import tag_index as ti
+from punch import version as ver
+from punch import version_part as vp
+
+
+@pytest.fixture
+def version():
+    v = ver.Version()
+    v.create_part('major', 0)
+    v.create_part('minor', 0)
+    v.create_part('patch', 0)
+    return v
+
+
+@pytest.fixture
+def prerelease_version(version):
+    version.create_part('prerelease', 'alpha', vp.ValueListVersionPart,
+                        ['alpha', 'beta', 'rc', 'final'])
+    return version
+
+
+def make_version(major, minor, patch):
+    v = ver.Version()
+    v.create_part('major', major)
+    v.create_part('minor', minor)
+    v.create_part('patch', patch)
+    return v
+
+
+@pytest.fixture
+def index(version):
+    tags = [
+        ('v1.10.0', 'a'),
+        ('v1.2.0', 'b'),
+        ('not-a-version', 'c'),
+        ('v1.9.3', 'd'),
+        ('v0.1.0', 'e'),
+        ('v1.2.0-dirty', 'f'),
+    ]
+    return ti.TagIndex(
+        tags, ver.VersionParser(version, 'v{{major}}.{{minor}}.{{patch}}'))
+
+
+def test_tag_index_skips_other_tags(index):
+    assert [t.name for t in index] == \
+        ['v0.1.0', 'v1.2.0', 'v1.9.3', 'v1.10.0']
+
+
+def test_tag_index_latest(index):
+    assert index.latest() == ('v1.10.0', 'a', index.latest().version)
+
+
+def test_tag_index_latest_without_tags(version):
+    index = ti.TagIndex([], ver.VersionParser(version, "{{major}}"))
+
+    assert len(index) == 0
+    assert index.latest() is None
+
+
+def test_tag_index_previous(index):
+    assert index.previous(make_version(1, 10, 0)).name == 'v1.9.3'
+    assert index.previous(make_version(1, 5, 0)).name == 'v1.2.0'
+    assert index.previous(make_version(0, 1, 0)) is None
+
+
+def test_tag_index_find(index):
+    assert index.find(make_version(1, 2, 0)).revision == 'b'
+    assert index.find(make_version(1, 2, 1)) is None
+
+
+def test_tag_index_range(index):
+    tags = index.range(make_version(1, 0, 0), make_version(1, 10, 0))
+
+    assert [t.name for t in tags] == ['v1.2.0', 'v1.9.3']
+    assert [t.name for t in index.range(start=make_version(1, 9, 3))] == \
+        ['v1.9.3', 'v1.10.0']
+
+
+def test_tag_index_orders_value_lists_by_position(prerelease_version):
+    tags = [('1.0.0-final', 'a'), ('1.0.0-alpha', 'b'), ('1.0.0-rc', 'c')]
+
+    index = ti.TagIndex(tags, ver.VersionParser(
+        prerelease_version, "{{major}}.{{minor}}.{{patch}}-{{prerelease}}"))
+
+    assert [t.name for t in index] == \
+        ['1.0.0-alpha', '1.0.0-rc', '1.0.0-final']
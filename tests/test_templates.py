@@ -0,0 +1,127 @@
+import jinja2
+import pytest
+
+from punch import templates
+
+
+def test_template_cache_compiles_each_source_once():
+    cache = templates.TemplateCache(jinja2.Environment())
+
+    t1 = cache.get("{{major}}.{{minor}}")
+    t2 = cache.get("{{major}}.{{minor}}")
+
+    assert t1 is t2
+    assert len(cache) == 1
+    assert t1.render(major=1, minor=2) == "1.2"
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = templates.TemplateCache(jinja2.Environment(), maxsize=2)
+
+    cache.get("{{major}}")
+    cache.get("{{minor}}")
+    cache.get("{{major}}")
+    cache.get("{{patch}}")
+
+    assert len(cache) == 2
+    assert "{{major}}" in cache
+    assert "{{minor}}" not in cache
+    assert "{{patch}}" in cache
+
+
+def test_template_cache_clear():
+    cache = templates.TemplateCache(jinja2.Environment())
+    cache.get("{{major}}")
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_get_template_uses_shared_cache():
+    assert templates.get_template("{{major}}") is \
+        templates.get_template("{{major}}")
+
+
+def test_get_config_template_keeps_undefined_variables():
+    template = templates.get_config_template("{{GLOBALS.serializer}}-{{a}}")
+
+    assert template.render(GLOBALS={'serializer': 'x'}) == "x-{{ a }}"
+
+
+@pytest.mark.parametrize('source', [
+    "{{major}}.{{minor}}.{{patch}}",
+    "__version__ = \"{{ major }}.{{ minor }}\"\n",
+    "{{major}}\r\n{{ unknown }}{{build}}",
+    "no variables at all",
+    "",
+])
+def test_simple_template_renders_like_jinja(source):
+    version = {'major': 1, 'minor': 2, 'patch': 3, 'build': None}
+
+    template = templates.SimpleTemplate.from_source(source)
+
+    assert template is not None
+    assert template.render(**version) == \
+        jinja2.Environment().from_string(source).render(**version)
+
+
+@pytest.mark.parametrize('source', [
+    "{{ major|string }}",
+    "{{ major }}{% if build %}+{{ build }}{% endif %}",
+    "{{ '+%s' % build }}",
+    "{# comment #}{{ major }}",
+    "{{- major }}",
+    "{{{ major }}}",
+    "{{ true }}",
+    "{{ self }}",
+    "{{ GLOBALS.serializer }}",
+])
+def test_simple_template_refuses_complex_templates(source):
+    assert templates.SimpleTemplate.from_source(source) is None
+
+
+def test_get_template_uses_fast_path_for_simple_templates():
+    assert isinstance(templates.get_template("{{major}}.{{minor}}"),
+                      templates.SimpleTemplate)
+    assert not isinstance(templates.get_template("{{major|string}}"),
+                          templates.SimpleTemplate)
+
+
+def test_render_cache_renders_each_value_once(mocker):
+    cache = templates.RenderCache(
+        templates.TemplateCache(jinja2.Environment()))
+    render = mocker.spy(jinja2.Template, 'render')
+
+    v1 = cache.render("{{GLOBALS.x}}", 'f1', GLOBALS={'x': 1})
+    v2 = cache.render("{{GLOBALS.x}}", 'f1', GLOBALS={'x': 1})
+
+    assert v1 == v2 == "1"
+    assert render.call_count == 1
+    assert len(cache) == 1
+
+
+def test_render_cache_keys_on_fingerprint():
+    cache = templates.RenderCache(
+        templates.TemplateCache(jinja2.Environment()))
+
+    cache.render("{{GLOBALS.x}}", 'f1', GLOBALS={'x': 1})
+
+    assert cache.render("{{GLOBALS.x}}", 'f2', GLOBALS={'x': 2}) == "2"
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = templates.RenderCache(
+        templates.TemplateCache(jinja2.Environment()), maxsize=1)
+
+    cache.render("{{GLOBALS.x}}", 'f1', GLOBALS={'x': 1})
+    cache.render("{{GLOBALS.x}}", 'f2', GLOBALS={'x': 2})
+
+    assert len(cache) == 1
+
+
+def test_fingerprint():
+    assert templates.fingerprint({'a': 1, 'b': [2]}) == \
+        templates.fingerprint({'b': [2], 'a': 1})
+    assert templates.fingerprint({'a': 1}) != templates.fingerprint({'a': 2})
+    assert templates.fingerprint(None) is None
@@ -0,0 +1,159 @@
+import os
+
+import pytest
+
+from punch import transaction as tr
+
+
+def write(filepath, content):
+    with open(filepath, 'w') as f:
+        f.write(content)
+
+
+def read(filepath):
+    with open(filepath, 'r') as f:
+        return f.read()
+
+
+@pytest.fixture
+def temp_dir_with_files(temp_empty_dir):
+    for name in ['a.txt', 'b.txt', 'c.txt']:
+        write(os.path.join(temp_empty_dir, name), "Version 1.0.0")
+
+    return temp_empty_dir
+
+
+@pytest.fixture
+def journal_path(temp_dir_with_files):
+    return os.path.join(temp_dir_with_files, tr.JOURNAL_FILE_NAME)
+
+
+def interrupted_transaction(mocker, temp_dir, journal_path):
+    transaction = tr.Transaction(journal_path)
+    for name in ['a.txt', 'b.txt', 'c.txt']:
+        transaction.stage(os.path.join(temp_dir, name), "Version 1.0.1")
+
+    original_replace_file = tr.replace_file
+    calls = []
+
+    def crashing_replace_file(source, destination):
+        # Crashes after the journal and the first file are in place
+        if destination == journal_path:
+            return original_replace_file(source, destination)
+        if len(calls) == 1:
+            raise KeyboardInterrupt()
+        calls.append(source)
+        original_replace_file(source, destination)
+
+    mocker.patch('punch.transaction.replace_file', crashing_replace_file)
+
+    with pytest.raises(KeyboardInterrupt):
+        transaction.commit()
+
+    mocker.stopall()
+
+
+def test_transaction_commit(temp_dir_with_files, journal_path):
+    transaction = tr.Transaction(journal_path)
+    for name in ['a.txt', 'b.txt']:
+        transaction.stage(
+            os.path.join(temp_dir_with_files, name), "Version 1.0.1")
+
+    assert read(os.path.join(temp_dir_with_files, 'a.txt')) == \
+        "Version 1.0.0"
+
+    transaction.commit()
+
+    assert read(os.path.join(temp_dir_with_files, 'a.txt')) == \
+        "Version 1.0.1"
+    assert read(os.path.join(temp_dir_with_files, 'b.txt')) == \
+        "Version 1.0.1"
+    assert sorted(os.listdir(temp_dir_with_files)) == \
+        ['a.txt', 'b.txt', 'c.txt']
+
+
+def test_transaction_rollback(temp_dir_with_files, journal_path):
+    transaction = tr.Transaction(journal_path)
+    transaction.stage(
+        os.path.join(temp_dir_with_files, 'a.txt'), "Version 1.0.1")
+
+    transaction.rollback()
+
+    assert read(os.path.join(temp_dir_with_files, 'a.txt')) == \
+        "Version 1.0.0"
+    assert sorted(os.listdir(temp_dir_with_files)) == \
+        ['a.txt', 'b.txt', 'c.txt']
+
+
+def test_transaction_commit_refuses_pending_journal(
+        temp_dir_with_files, journal_path):
+    write(journal_path, '{"entries": []}')
+
+    transaction = tr.Transaction(journal_path)
+    transaction.stage(
+        os.path.join(temp_dir_with_files, 'a.txt'), "Version 1.0.1")
+
+    with pytest.raises(tr.TransactionError):
+        transaction.commit()
+
+
+def test_transaction_recover_rollback(
+        mocker, temp_dir_with_files, journal_path):
+    interrupted_transaction(mocker, temp_dir_with_files, journal_path)
+
+    contents = [read(os.path.join(temp_dir_with_files, name))
+                for name in ['a.txt', 'b.txt', 'c.txt']]
+    assert contents == ["Version 1.0.1", "Version 1.0.0", "Version 1.0.0"]
+
+    tr.Transaction.recover(journal_path)
+
+    for name in ['a.txt', 'b.txt', 'c.txt']:
+        assert read(os.path.join(temp_dir_with_files, name)) == \
+            "Version 1.0.0"
+    assert sorted(os.listdir(temp_dir_with_files)) == \
+        ['a.txt', 'b.txt', 'c.txt']
+
+
+def test_transaction_recover_truncated_journal(
+        temp_dir_with_files, journal_path):
+    transaction = tr.Transaction(journal_path)
+    transaction.stage(
+        os.path.join(temp_dir_with_files, 'a.txt'), "Version 1.0.1")
+    os.mkdir(os.path.join(temp_dir_with_files, 'sub'))
+    transaction.stage(
+        os.path.join(temp_dir_with_files, 'sub', 'd.txt'), "Version 1.0.1")
+    write(journal_path, '{"entries": [{"target": "')
+
+    assert tr.Transaction.recover(journal_path) == []
+
+    assert read(os.path.join(temp_dir_with_files, 'a.txt')) == \
+        "Version 1.0.0"
+    assert sorted(os.listdir(temp_dir_with_files)) == \
+        ['a.txt', 'b.txt', 'c.txt', 'sub']
+    assert os.listdir(os.path.join(temp_dir_with_files, 'sub')) == []
+
+
+def test_transaction_journal_is_replaced_atomically(
+        mocker, temp_dir_with_files, journal_path):
+    transaction = tr.Transaction(journal_path)
+    transaction.stage(
+        os.path.join(temp_dir_with_files, 'a.txt'), "Version 1.0.1")
+
+    replace_file = mocker.spy(tr, 'replace_file')
+    transaction.commit()
+
+    destinations = [c[0][1] for c in replace_file.call_args_list]
+    assert destinations[0] == journal_path
+
+
+def test_transaction_recover_replay(
+        mocker, temp_dir_with_files, journal_path):
+    interrupted_transaction(mocker, temp_dir_with_files, journal_path)
+
+    tr.Transaction.recover(journal_path, replay=True)
+
+    for name in ['a.txt', 'b.txt', 'c.txt']:
+        assert read(os.path.join(temp_dir_with_files, name)) == \
+            "Version 1.0.1"
+    assert sorted(os.listdir(temp_dir_with_files)) == \
+        ['a.txt', 'b.txt', 'c.txt']
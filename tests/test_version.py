@@ -143,6 +143,55 @@ def test_version_compare_differ(version_mmp):
     assert new_version != version_mmp
 
 
+def test_version_ordering(version_mmp):
+    new_version = version_mmp.copy()
+    new_version.inc('minor')
+
+    assert version_mmp < new_version
+    assert new_version >= version_mmp
+    assert not new_version < version_mmp
+
+
+def test_version_ordering_uses_integer_values():
+    versions = []
+    for minor in [10, 9, 2]:
+        v = ver.Version()
+        v.create_part('major', 1)
+        v.create_part('minor', minor)
+        versions.append(v)
+
+    assert [v.get_part('minor').value for v in sorted(versions)] == \
+        [2, 9, 10]
+
+
+def test_version_ordering_uses_value_list_positions(version_mmp):
+    versions = []
+    for prerelease in ['rc', 'alpha', 'final']:
+        v = version_mmp.copy()
+        v.create_part('prerelease', prerelease, vp.ValueListVersionPart,
+                      ['alpha', 'beta', 'rc', 'final'])
+        versions.append(v)
+
+    assert [v.get_part('prerelease').value for v in sorted(versions)] == \
+        ['alpha', 'rc', 'final']
+
+
+def test_version_ordering_needs_the_same_parts(version_mmp, version_mmpb):
+    with pytest.raises(TypeError):
+        version_mmp < version_mmpb
+
+
+def test_version_sort_key(version_mmp):
+    assert version_mmp.sort_key == (4, 3, 1)
+
+
+def test_version_hash(version_mmp):
+    new_version = version_mmp.copy()
+
+    assert hash(new_version) == hash(version_mmp)
+    assert len({version_mmp, new_version}) == 1
+
+
 def test_version_as_list(version_mmp):
     assert version_mmp.as_list() == [('major', 4), ('minor', 3), ('patch', 1)]
 
@@ -236,3 +285,125 @@ def test_read_simplified_version_from_file(temp_empty_dir, version_mmp):
     assert version.parts['major'].value == 4
     assert version.parts['minor'].value == 3
     assert version.parts['patch'].value == 1
+
+
+def test_read_version_file_with_strings(temp_empty_dir):
+    version_filepath = os.path.join(temp_empty_dir, 'punch_version.py')
+
+    with open(version_filepath, 'w') as f:
+        f.writelines(["major = 4\n", "prerelease = 'beta'\n"])
+
+    version_description = [
+        'major',
+        {
+            'name': 'prerelease',
+            'type': 'value_list',
+            'allowed_values': ['alpha', 'beta']
+        }
+    ]
+
+    version = ver.Version.from_file(version_filepath, version_description)
+
+    assert version.as_dict() == {'major': 4, 'prerelease': 'beta'}
+    assert version_description[1]['type'] == 'value_list'
+
+
+def test_read_version_file_executing_it(temp_empty_dir):
+    clean_previous_imports()
+
+    version_filepath = os.path.join(temp_empty_dir, 'punch_version.py')
+
+    with open(version_filepath, 'w') as f:
+        f.writelines(["major = 2 * 2\n", "minor = 3\n"])
+
+    version = ver.Version.from_file(
+        version_filepath, ['major', 'minor'], execute=True)
+
+    assert version.as_dict() == {'major': 4, 'minor': 3}
+
+
+def test_read_version_file_missing_part(temp_empty_dir):
+    version_filepath = os.path.join(temp_empty_dir, 'punch_version.py')
+
+    with open(version_filepath, 'w') as f:
+        f.writelines(["major = 4\n"])
+
+    with pytest.raises(ValueError):
+        ver.Version.from_file(version_filepath, ['major', 'minor'])
+
+
+def test_version_from_description():
+    version = ver.Version.from_description([
+        'major',
+        {'name': 'build', 'type': 'integer', 'start_value': 1},
+        {'name': 'prerelease', 'type': 'value_list',
+         'allowed_values': ['alpha', 'beta']}
+    ])
+
+    assert version.as_list() == \
+        [('major', 0), ('build', 1), ('prerelease', 'alpha')]
+
+
+def test_version_from_string(version_mmp):
+    version = ver.Version.from_string(
+        "4.3.1", "{{major}}.{{minor}}.{{patch}}", ['major', 'minor', 'patch'])
+
+    assert version == version_mmp
+
+
+def test_version_from_string_does_not_change_the_description():
+    description = [
+        {'name': 'major', 'type': 'integer'},
+        {'name': 'prerelease', 'type': 'value_list',
+         'allowed_values': ['', 'alpha', 'beta']}
+    ]
+
+    version = ver.Version.from_string(
+        "1-beta", "{{major}}-{{prerelease}}", description)
+
+    assert version.as_dict() == {'major': 1, 'prerelease': 'beta'}
+    assert description[1]['type'] == 'value_list'
+
+
+def test_version_from_string_not_matching():
+    with pytest.raises(ValueError):
+        ver.Version.from_string(
+            "4.3", "{{major}}.{{minor}}.{{patch}}",
+            ['major', 'minor', 'patch'])
+
+
+def test_version_parser_typed_values():
+    version = ver.Version()
+    version.create_part('year', None, vp.DateVersionPart, 'YYYY')
+    version.create_part('month', None, vp.DateVersionPart, 'MM')
+    version.create_part('build', 0)
+    version.create_part('stage', 2, vp.ValueListVersionPart, [2, 4, 8])
+    parser = ver.VersionParser(
+        version, "{{year}}.{{month}}.{{build}}-{{stage}}")
+
+    assert parser.parse_dict("2018.7.12-4") == \
+        {'year': '2018', 'month': '7', 'build': 12, 'stage': 4}
+    assert parser.parse_dict("18.7.12-4") is None
+    assert parser.parse_dict("2018.7.12-5") is None
+
+
+def test_version_parser_repeated_and_unknown_names(version_mmp):
+    parser = ver.VersionParser(
+        version_mmp, "{{major}}.{{minor}}/{{major}}-{{commit}}")
+
+    assert parser.parse("4.3/4-abcdef").as_dict() == \
+        {'major': 4, 'minor': 3, 'patch': 1}
+    assert parser.parse("4.3/5-abcdef") is None
+
+
+def test_version_parser_refuses_complex_serializers(version_mmp):
+    with pytest.raises(ValueError):
+        ver.VersionParser(
+            version_mmp, "{{major}}{% if minor %}.{{minor}}{% endif %}")
+
+
+def test_get_parser_is_cached():
+    description = ['major', 'minor']
+
+    assert ver.get_parser("{{major}}.{{minor}}", description) is \
+        ver.get_parser("{{major}}.{{minor}}", list(description))
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from punch import version as ver
+from punch import version_file as vf
+from punch import version_part as vp
+
+
+def test_parse_literals():
+    content = "major = 1\nminor = 2\nprerelease = 'alpha'\n"
+
+    assert list(vf.parse(content).items()) == \
+        [('major', 1), ('minor', 2), ('prerelease', 'alpha')]
+
+
+def test_parse_skips_comments_and_empty_lines():
+    content = "# Version file\n\nmajor = 1  # The major number\n"
+
+    assert vf.parse(content) == {'major': 1}
+
+
+def test_parse_keeps_hashes_in_strings():
+    assert vf.parse("build = 'a#b'\n") == {'build': 'a#b'}
+
+
+def test_parse_values_written_without_quotes():
+    content = "prerelease = alpha\nbuild = \nmonth = 07\n"
+
+    assert vf.parse(content) == \
+        {'prerelease': 'alpha', 'build': '', 'month': '07'}
+
+
+def test_parse_refuses_statements():
+    with pytest.raises(ValueError):
+        vf.parse("import os\nmajor = 1\n")
+
+
+def test_parse_does_not_execute_code():
+    assert vf.parse("major = __import__('os').getcwd()\n") == \
+        {'major': "__import__('os').getcwd()"}
+
+
+def test_render():
+    version = ver.Version()
+    version.create_part('major', 1)
+    version.create_part('prerelease', '', vp.ValueListVersionPart,
+                        ['', 'alpha'])
+    version.create_part('month', '07', vp.DateVersionPart, '0M')
+
+    assert vf.render(version) == \
+        "major = 1\nprerelease = ''\nmonth = '07'\n"
+
+
+def test_write_and_read(temp_empty_dir):
+    version = ver.Version()
+    version.create_part('major', 1)
+    version.create_part('name', "it's", vp.ValueListVersionPart, ["it's"])
+    filepath = os.path.join(temp_empty_dir, 'punch_version.py')
+
+    vf.write(filepath, version)
+
+    assert vf.read(filepath) == {'major': 1, 'name': "it's"}
@@ -131,6 +131,40 @@ def test_valuelist_version_part_copy():
     assert nvp.values == [0, 2, 4, 6, 8]
 
 
+def test_integer_version_part_ordering():
+    assert vpart.IntegerVersionPart('major', 9) < \
+        vpart.IntegerVersionPart('major', 10)
+    assert vpart.IntegerVersionPart('major', 9) == \
+        vpart.IntegerVersionPart('major', '9')
+
+
+def test_valuelist_version_part_ordering():
+    values = ['alpha', 'beta', 'rc', 'final']
+
+    assert vpart.ValueListVersionPart('pre', 'rc', values) < \
+        vpart.ValueListVersionPart('pre', 'final', values)
+    assert vpart.ValueListVersionPart('pre', 'rc', values) > \
+        vpart.ValueListVersionPart('pre', 'beta', values)
+
+
+def test_date_version_part_ordering_of_unpadded_values():
+    assert vpart.DateVersionPart('month', '9', 'MM') < \
+        vpart.DateVersionPart('month', '10', 'MM')
+
+
+def test_version_parts_with_different_names_cannot_be_ordered():
+    with pytest.raises(TypeError):
+        vpart.IntegerVersionPart('major', 1) < \
+            vpart.IntegerVersionPart('minor', 2)
+
+
+def test_version_part_hash():
+    parts = {vpart.IntegerVersionPart('major', 1),
+             vpart.IntegerVersionPart('major', 1)}
+
+    assert len(parts) == 1
+
+
 def test_get_integer_version_part_from_full_dict():
     input_dict = {
         'name': 'major',
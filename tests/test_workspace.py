@@ -0,0 +1,245 @@
+import os
+import subprocess
+
+import pytest
+
+from punch import workspace as ws
+from tests.conftest import read_file, write_file
+
+config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {{
+    'serializer': '{{{{major}}}}.{{{{minor}}}}.{{{{patch}}}}'
+}}
+
+FILES = ['README.md']
+
+VERSION = ['major', 'minor', 'patch']
+
+DEPENDENCIES = {dependencies}
+"""
+
+root_config_file_content = """
+__config_version__ = 1
+
+GLOBALS = {
+    'serializer': '{{major}}.{{minor}}.{{patch}}'
+}
+
+FILES = []
+
+VERSION = ['major', 'minor', 'patch']
+
+VCS = {
+    'name': 'git',
+    'commit_message': 'Bump {{ packages }}'
+}
+"""
+
+
+def add_package(root, name, version, dependencies=None, requirements=None):
+    package_dir = os.path.join(root, name)
+    major, minor, patch = version.split('.')
+
+    write_file(os.path.join(package_dir, 'punch_config.py'),
+               config_file_content.format(
+                   dependencies=repr(dependencies or [])))
+    write_file(os.path.join(package_dir, 'punch_version.py'),
+               "major = {}\nminor = {}\npatch = {}\n".format(
+                   major, minor, patch))
+    write_file(os.path.join(package_dir, 'README.md'), "Version " + version)
+
+    if requirements is not None:
+        write_file(os.path.join(package_dir, 'requirements.txt'),
+                   requirements)
+
+
+@pytest.fixture
+def workspace_dir(temp_empty_dir):
+    # core <- utils <- app, core <- cli, and docs on its own
+    add_package(temp_empty_dir, 'libs/core', '1.2.3')
+    add_package(temp_empty_dir, 'libs/utils', '0.4.0', [
+        {
+            'path': '../core',
+            'files': ['requirements.txt'],
+            'serializer': 'core=={{major}}.{{minor}}.{{patch}}'
+        }
+    ], "core==1.2.3\nsix==1.2.3\n")
+    add_package(temp_empty_dir, 'app', '2.0.0', ['../libs/utils'])
+    add_package(temp_empty_dir, 'cli', '0.1.0', ['../libs/core'])
+    add_package(temp_empty_dir, 'docs', '3.0.0')
+
+    # A version file without a config file is not a package
+    write_file(os.path.join(temp_empty_dir, 'other', 'punch_version.py'),
+               "major = 1\n")
+
+    return temp_empty_dir
+
+
+def test_workspace_discovers_packages(workspace_dir):
+    workspace = ws.Workspace(workspace_dir)
+
+    assert list(workspace.packages) == \
+        ['app', 'cli', 'docs', 'libs/core', 'libs/utils']
+    assert workspace.dependents['libs/core'] == ['cli', 'libs/utils']
+    assert workspace.packages['libs/utils'].dependencies == [
+        ws.Dependency('libs/core', ['requirements.txt'],
+                      'core=={{major}}.{{minor}}.{{patch}}')
+    ]
+    assert workspace.packages['app'].dependencies == [
+        ws.Dependency('libs/utils', [], '{{major}}.{{minor}}.{{patch}}')
+    ]
+
+
+def test_workspace_unknown_dependency(workspace_dir):
+    add_package(workspace_dir, 'broken', '1.0.0', ['../missing'])
+
+    with pytest.raises(ValueError):
+        ws.Workspace(workspace_dir)
+
+
+def test_workspace_waves(workspace_dir):
+    workspace = ws.Workspace(workspace_dir)
+
+    assert workspace.affected(['libs/utils']) == set(['libs/utils', 'app'])
+    assert workspace.waves(['libs/core']) == \
+        [['libs/core'], ['cli', 'libs/utils'], ['app']]
+    assert workspace.waves(['docs', 'libs/utils']) == \
+        [['docs', 'libs/utils'], ['app']]
+
+
+def test_workspace_waves_unknown_package(workspace_dir):
+    workspace = ws.Workspace(workspace_dir)
+
+    with pytest.raises(ValueError):
+        workspace.waves(['missing'])
+
+
+def test_workspace_waves_cycle(temp_empty_dir):
+    add_package(temp_empty_dir, 'a', '1.0.0', ['../b'])
+    add_package(temp_empty_dir, 'b', '1.0.0', ['../a'])
+    workspace = ws.Workspace(temp_empty_dir)
+
+    with pytest.raises(ValueError):
+        workspace.waves(['a'])
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_workspace_run(workspace_dir, jobs):
+    workspace = ws.Workspace(workspace_dir, jobs)
+
+    results = list(workspace.run(['libs/core'], part='minor'))
+
+    assert [(r.name, r.wave, r.current_version, r.new_version)
+            for r in results] == [
+        ('libs/core', 0, '1.2.3', '1.3.0'),
+        ('cli', 1, '0.1.0', '0.1.1'),
+        ('libs/utils', 1, '0.4.0', '0.4.1'),
+        ('app', 2, '2.0.0', '2.0.1'),
+    ]
+    assert all(r.exception is None for r in results)
+
+    utils_dir = os.path.join(workspace_dir, 'libs', 'utils')
+    assert results[2].changed_files == [
+        os.path.join(utils_dir, 'README.md'),
+        os.path.join(utils_dir, 'requirements.txt'),
+    ]
+
+    # Only the pins of the dependency are changed
+    assert read_file(os.path.join(utils_dir, 'requirements.txt')) == \
+        "core==1.3.0\nsix==1.2.3\n"
+    assert read_file(os.path.join(utils_dir, 'punch_version.py')) == \
+        "major = 0\nminor = 4\npatch = 1\n"
+    assert read_file(os.path.join(workspace_dir, 'docs', 'README.md')) == \
+        "Version 3.0.0"
+
+
+def test_workspace_run_dependents_part(workspace_dir):
+    workspace = ws.Workspace(workspace_dir)
+
+    results = list(workspace.run(
+        ['libs/utils'], set_part='major=1', reset_on_set=True,
+        dependents_part='minor'))
+
+    assert [(r.name, r.new_version) for r in results] == \
+        [('libs/utils', '1.0.0'), ('app', '2.1.0')]
+
+
+def test_workspace_run_stops_after_failed_wave(workspace_dir):
+    os.remove(os.path.join(workspace_dir, 'libs', 'utils', 'README.md'))
+    workspace = ws.Workspace(workspace_dir)
+
+    results = list(workspace.run(['libs/core'], part='patch'))
+
+    assert [r.name for r in results] == ['libs/core', 'cli', 'libs/utils']
+    assert results[2].exception is not None
+    assert read_file(os.path.join(workspace_dir, 'app', 'README.md')) == \
+        "Version 2.0.0"
+
+
+def test_workspace_run_closes_repository_on_failure(workspace_dir, mocker):
+    os.remove(os.path.join(workspace_dir, 'app', 'README.md'))
+    workspace = ws.Workspace(workspace_dir)
+
+    use_case = mocker.Mock()
+    mocker.patch.object(ws.Workspace, '_use_case', return_value=use_case)
+
+    results = list(workspace.run(['libs/utils'], part='patch'))
+
+    assert results[-1].exception is not None
+    assert not use_case.finish_release.called
+    assert use_case.close.called
+
+
+@pytest.mark.slow
+def test_workspace_run_single_commit(workspace_dir):
+    write_file(os.path.join(workspace_dir, 'punch_config.py'),
+               root_config_file_content)
+    write_file(os.path.join(workspace_dir, 'punch_version.py'),
+               "major = 0\nminor = 0\npatch = 0\n")
+
+    def git(*args):
+        return subprocess.check_output(
+            ['git'] + list(args), cwd=workspace_dir).decode('utf8')
+
+    git('init', '-q')
+    git('config', 'user.email', 'punch@example.com')
+    git('config', 'user.name', 'Punch')
+    git('add', '.')
+    git('commit', '-q', '-m', 'Initial')
+
+    workspace = ws.Workspace(workspace_dir)
+    results = list(workspace.run(['libs/utils'], part='patch'))
+
+    assert all(r.exception is None for r in results)
+    assert git('rev-list', '--count', 'HEAD').strip() == '2'
+    assert git('log', '-1', '--format=%s').strip() == \
+        'Bump app 2.0.0 -> 2.0.1, libs/utils 0.4.0 -> 0.4.1'
+    assert git('status', '--porcelain').strip() == ''
+
+
+@pytest.mark.slow
+def test_workspace_run_with_root_package(workspace_dir):
+    write_file(os.path.join(workspace_dir, 'punch_config.py'),
+               root_config_file_content)
+    write_file(os.path.join(workspace_dir, 'punch_version.py'),
+               "major = 0\nminor = 0\npatch = 0\n")
+
+    def git(*args):
+        return subprocess.check_output(
+            ['git'] + list(args), cwd=workspace_dir).decode('utf8')
+
+    git('init', '-q')
+    git('config', 'user.email', 'punch@example.com')
+    git('config', 'user.name', 'Punch')
+    git('add', '.')
+    git('commit', '-q', '-m', 'Initial')
+
+    workspace = ws.Workspace(workspace_dir)
+    results = list(workspace.run(['.', 'libs/utils'], part='patch'))
+
+    assert all(r.exception is None for r in results)
+    assert git('tag').split() == ['root-0.0.1+app-2.0.1+libs-utils-0.4.1']
+    assert git('log', '-1', '--format=%s').strip() == \
+        'Bump . 0.0.0 -> 0.0.1, app 2.0.0 -> 2.0.1, libs/utils 0.4.0 -> 0.4.1'
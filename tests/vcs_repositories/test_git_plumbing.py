@@ -0,0 +1,119 @@
+import subprocess
+
+import os
+import pytest
+from punch import vcs_configuration as vc
+from punch.vcs_repositories import git_plumbing as gp
+from punch.vcs_repositories import git_repo as gr, exceptions as re
+
+pytestmark = pytest.mark.slow
+
+
+@pytest.fixture
+def temp_git_dir(temp_empty_dir, safe_devnull):
+    subprocess.check_call(["git", "init", "-q", temp_empty_dir])
+    subprocess.check_call(["git", "config", "user.email",
+                           "py.test@email.com"], cwd=temp_empty_dir)
+    subprocess.check_call(["git", "config", "user.name",
+                           "PyTest"], cwd=temp_empty_dir)
+
+    with open(os.path.join(temp_empty_dir, "README.md"), "w") as f:
+        f.writelines(["# Test file", "This is just a test file for punch"])
+
+    subprocess.check_call(["git", "add", "README.md"],
+                          cwd=temp_empty_dir, stdout=safe_devnull)
+    subprocess.check_call(["git", "commit", "-m", "Initial addition"],
+                          cwd=temp_empty_dir, stdout=safe_devnull)
+
+    return temp_empty_dir
+
+
+def git_output(temp_git_dir, *args):
+    return subprocess.check_output(
+        ["git"] + list(args), cwd=temp_git_dir).decode('utf8')
+
+
+def test_refs_reader_current_branch(temp_git_dir, safe_devnull):
+    refs = gp.RefsReader(gp.find_git_dir(temp_git_dir))
+
+    assert refs.current_branch() == 'master'
+
+    subprocess.check_call(["git", "checkout", "-q", "-b", "feature/x"],
+                          cwd=temp_git_dir, stdout=safe_devnull)
+
+    assert refs.current_branch() == 'feature/x'
+
+    subprocess.check_call(["git", "checkout", "-q", "--detach"],
+                          cwd=temp_git_dir, stdout=safe_devnull)
+
+    assert refs.current_branch() == 'HEAD'
+
+
+def test_refs_reader_tags_matches_git(temp_git_dir, safe_devnull):
+    for tag in ["1.0.0", "1.1.0", "release/2.0.0"]:
+        subprocess.check_call(["git", "tag", tag], cwd=temp_git_dir)
+    subprocess.check_call(["git", "pack-refs", "--all"], cwd=temp_git_dir)
+    subprocess.check_call(["git", "tag", "-a", "0.9.0", "-m", "Old"],
+                          cwd=temp_git_dir)
+
+    refs = gp.RefsReader(gp.find_git_dir(temp_git_dir))
+    tags = refs.refs('refs/tags/')
+
+    assert sorted(tags) == sorted(git_output(temp_git_dir, "tag").split())
+    assert tags['1.0.0'] == git_output(
+        temp_git_dir, "rev-parse", "1.0.0").strip()
+
+
+def test_refs_reader_in_linked_worktree(temp_git_dir, safe_devnull):
+    subprocess.check_call(["git", "tag", "1.0.0"], cwd=temp_git_dir)
+    worktree = os.path.join(temp_git_dir, "worktree")
+    subprocess.check_call(["git", "worktree", "add", "-q", "-b", "feature",
+                           worktree], cwd=temp_git_dir, stdout=safe_devnull)
+
+    refs = gp.RefsReader(gp.find_git_dir(worktree))
+
+    assert refs.current_branch() == 'feature'
+    assert sorted(refs.refs('refs/tags/')) == ['1.0.0']
+
+    repo = gr.GitRepo(worktree, vc.VCSConfiguration(
+        'git', {}, {}, {'current_version': 'a', 'new_version': 'b'}))
+    assert repo.get_tags() == git_output(worktree, "tag")
+    repo.close()
+
+
+def test_cat_file_batch_resolve(temp_git_dir):
+    cat_file = gp.CatFileBatch(temp_git_dir)
+
+    try:
+        sha, object_type = cat_file.resolve("HEAD")
+        assert sha == git_output(temp_git_dir, "rev-parse", "HEAD").strip()
+        assert object_type == 'commit'
+
+        assert cat_file.resolve("refs/tags/missing") is None
+        assert cat_file.resolve("HEAD:README.md")[1] == 'blob'
+    finally:
+        cat_file.close()
+
+
+def test_git_repo_reads_do_not_spawn_processes(mocker, temp_git_dir):
+    repo = gr.GitRepo(temp_git_dir, vc.VCSConfiguration(
+        'git', {}, {}, {'current_version': 'a', 'new_version': 'b'}))
+    subprocess.check_call(["git", "tag", "1.0.0"], cwd=temp_git_dir)
+
+    run = mocker.spy(repo, '_run')
+
+    assert repo.get_current_branch() == 'master'
+    assert repo.get_tags() == git_output(temp_git_dir, "tag")
+    assert run.call_count == 0
+
+
+def test_pre_start_release_with_existing_tag(temp_git_dir):
+    subprocess.check_call(["git", "tag", "b"], cwd=temp_git_dir)
+
+    repo = gr.GitRepo(temp_git_dir, vc.VCSConfiguration(
+        'git', {}, {}, {'current_version': 'a', 'new_version': 'b'}))
+
+    with pytest.raises(re.RepositoryStatusError):
+        repo.pre_start_release()
+
+    repo.close()
@@ -313,3 +313,175 @@ def test_tag(temp_git_dir, empty_vcs_configuration):
     repo.tag("just_a_tag")
 
     assert "just_a_tag" in repo.get_tags()
+
+
+def test_list_tags(temp_git_dir, empty_vcs_configuration):
+    repo = gr.GitRepo(temp_git_dir, empty_vcs_configuration)
+    head = repo.resolve("HEAD")[0]
+
+    repo.tag("lightweight")
+    subprocess.check_call(["git", "tag", "-a", "annotated", "-m", "A tag"],
+                          cwd=temp_git_dir)
+
+    assert sorted(repo.list_tags()) == \
+        [("annotated", head), ("lightweight", head)]
+
+
+def test_plumbing_release(temp_git_dir):
+    release_name = "1.0"
+    commit_message = "A commit message"
+    config = vc.VCSConfiguration(
+        'git', {'plumbing_release': True}, global_variables={},
+        special_variables={'new_version': release_name},
+        commit_message=commit_message
+    )
+
+    repo = gr.GitRepo(temp_git_dir, config)
+    repo.pre_start_release()
+    repo.start_release()
+    assert release_name not in repo.get_branches()
+
+    with open(os.path.join(temp_git_dir, "version.txt"), "w") as f:
+        f.writelines([release_name])
+
+    repo.finish_release()
+    repo.close()
+
+    log = subprocess.check_output(
+        ["git", "log", "--format=%s", "master"], cwd=temp_git_dir)
+    assert log.decode('utf8').splitlines() == \
+        [commit_message, "Initial addition"]
+
+    status = subprocess.check_output(
+        ["git", "status", "--porcelain"], cwd=temp_git_dir)
+    assert status.decode('utf8') == ""
+
+    assert repo.get_current_branch() == "master"
+    assert release_name in repo.get_tags()
+    assert release_name not in repo.get_branches()
+
+
+def test_plumbing_release_without_changes(temp_git_dir):
+    release_name = "1.0"
+    config = vc.VCSConfiguration(
+        'git', {'plumbing_release': True}, global_variables={},
+        special_variables={'new_version': release_name}
+    )
+
+    repo = gr.GitRepo(temp_git_dir, config)
+    repo.pre_start_release()
+    repo.start_release()
+    repo.finish_release()
+    repo.close()
+
+    log = subprocess.check_output(
+        ["git", "log", "--format=%s", "master"], cwd=temp_git_dir)
+    assert log.decode('utf8').splitlines() == ["Initial addition"]
+    assert release_name not in repo.get_tags()
+
+
+def test_get_status(temp_git_dir, safe_devnull, empty_vcs_configuration):
+    with open(os.path.join(temp_git_dir, "staged file.txt"), "w") as f:
+        f.write("Staged")
+    subprocess.check_call(["git", "add", "staged file.txt"],
+                          cwd=temp_git_dir, stdout=safe_devnull)
+    subprocess.check_call(["git", "mv", "README.md", "README.txt"],
+                          cwd=temp_git_dir, stdout=safe_devnull)
+    with open(os.path.join(temp_git_dir, "README.txt"), "a") as f:
+        f.write("Unstaged")
+    with open(os.path.join(temp_git_dir, "untracked.txt"), "w") as f:
+        f.write("Untracked")
+
+    repo = gr.GitRepo(temp_git_dir, empty_vcs_configuration)
+
+    status = repo.get_status()
+
+    assert status.staged == {"staged file.txt", "README.txt"}
+    assert status.unstaged == {"README.txt"}
+    assert status.unmerged == set()
+    assert status.untracked == set()
+    assert not status.is_clean()
+
+    assert repo.get_status(untracked=True).untracked == {"untracked.txt"}
+
+
+def test_get_status_clean(temp_git_dir, empty_vcs_configuration):
+    with open(os.path.join(temp_git_dir, "untracked.txt"), "w") as f:
+        f.write("Untracked")
+
+    repo = gr.GitRepo(temp_git_dir, empty_vcs_configuration)
+
+    assert repo.get_status().is_clean()
+
+
+def test_parse_status():
+    output = "\0".join([
+        "1 M. N... 100644 100644 100644 aaa bbb staged.txt",
+        "1 .M N... 100644 100644 100644 aaa aaa with space.txt",
+        "2 R. N... 100644 100644 100644 aaa aaa R100 new.txt",
+        "old.txt",
+        "u UU N... 100644 100644 100644 100644 aaa bbb ccc conflict.txt",
+        "? untracked.txt",
+        "! ignored.txt",
+        ""
+    ])
+
+    status = gr.GitRepo._parse_status(output)
+
+    assert status.staged == {"staged.txt", "new.txt"}
+    assert status.unstaged == {"with space.txt"}
+    assert status.unmerged == {"conflict.txt"}
+    assert status.untracked == {"untracked.txt"}
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'make_release_branch': False},
+    {'plumbing_release': True},
+])
+def test_finish_release_stages_only_given_files(temp_git_dir, options):
+    release_name = "1.0"
+    config = vc.VCSConfiguration(
+        'git', options, global_variables={},
+        special_variables={'new_version': release_name}
+    )
+
+    repo = gr.GitRepo(temp_git_dir, config)
+    repo.pre_start_release()
+    repo.start_release()
+
+    with open(os.path.join(temp_git_dir, "version.txt"), "w") as f:
+        f.write(release_name)
+    with open(os.path.join(temp_git_dir, "build.log"), "w") as f:
+        f.write("Build artifact")
+
+    repo.finish_release([os.path.join(temp_git_dir, "version.txt")])
+    repo.close()
+
+    files = subprocess.check_output(
+        ["git", "ls-tree", "--name-only", "master"], cwd=temp_git_dir)
+    assert files.decode('utf8').split() == ["README.md", "version.txt"]
+    assert release_name in repo.get_tags()
+    assert repo.get_status(untracked=True).untracked == {"build.log"}
+
+
+def test_finish_release_without_changes_in_given_files(temp_git_dir):
+    release_name = "1.0"
+    config = vc.VCSConfiguration(
+        'git', {}, global_variables={},
+        special_variables={'new_version': release_name}
+    )
+
+    repo = gr.GitRepo(temp_git_dir, config)
+    repo.pre_start_release()
+    repo.start_release()
+
+    with open(os.path.join(temp_git_dir, "README.md"), "a") as f:
+        f.write("Local change")
+
+    repo.finish_release([])
+    repo.close()
+
+    assert repo.get_current_branch() == "master"
+    assert release_name not in repo.get_branches()
+    assert release_name not in repo.get_tags()
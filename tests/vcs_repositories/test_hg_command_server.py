@@ -0,0 +1,117 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from punch.vcs_repositories import hg_command_server as hcs
+
+FAKE_SERVER = """\
+#!{python}
+import struct
+import sys
+
+stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+
+
+def write(channel, data):
+    stdout.write(struct.pack('>cI', channel, len(data)) + data)
+    stdout.flush()
+
+
+write(b'o', {hello!r})
+
+while True:
+    line = stdin.readline()
+    if not line:
+        break
+    length = struct.unpack('>I', stdin.read(4))[0]
+    args = stdin.read(length).split(b'\\0')
+
+    if args[0] == b'ask':
+        stdout.write(struct.pack('>cI', b'L', 4096))
+        stdout.flush()
+        answer = stdin.read(struct.unpack('>I', stdin.read(4))[0])
+        write(b'o', b'answer:' + answer)
+    elif args[0] == b'fail':
+        write(b'e', b'abort: failed')
+        write(b'r', struct.pack('>i', 255))
+        continue
+    elif args[0] == b'die':
+        break
+
+    write(b'o', b' '.join(args))
+    write(b'r', struct.pack('>i', 0))
+"""
+
+DEFAULT_HELLO = b'capabilities: getencoding runcommand\nencoding: UTF-8'
+
+
+def fake_server(path, hello=DEFAULT_HELLO):
+    script = os.path.join(str(path), 'fakehg')
+    with open(script, 'w') as f:
+        f.write(FAKE_SERVER.format(python=sys.executable, hello=hello))
+    os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+
+    return script
+
+
+@pytest.fixture
+def server(tmpdir):
+    server = hcs.HgCommandServer(str(tmpdir), fake_server(tmpdir))
+    yield server
+    server.close()
+
+
+def test_runcommand(server):
+    assert server.runcommand(['log', '-r', 'tip']) == \
+        (0, b'log -r tip', b'')
+
+
+def test_runcommand_reuses_the_server(server):
+    server.runcommand(['branch'])
+    process = server._process
+
+    server.runcommand(['summary'])
+
+    assert server._process is process
+
+
+def test_hello_message_is_parsed(server):
+    server.start()
+
+    assert server.capabilities == {'getencoding', 'runcommand'}
+    assert server.encoding == 'UTF-8'
+
+
+def test_runcommand_error(server):
+    assert server.runcommand(['fail']) == (255, b'', b'abort: failed')
+
+
+def test_input_requests_get_no_input(server):
+    assert server.runcommand(['ask']) == (0, b'answer:ask', b'')
+
+
+def test_server_death_is_reported(server):
+    with pytest.raises(hcs.CommandServerError):
+        server.runcommand(['die'])
+
+    assert not server.running
+
+
+def test_missing_runcommand_capability(tmpdir):
+    server = hcs.HgCommandServer(
+        str(tmpdir), fake_server(tmpdir, b'capabilities: getencoding'))
+
+    with pytest.raises(hcs.CommandServerError):
+        server.start()
+
+    assert not server.running
+
+
+def test_missing_command(tmpdir):
+    server = hcs.HgCommandServer(str(tmpdir), 'not-a-real-hg-command')
+
+    with pytest.raises(hcs.CommandServerError):
+        server.start()
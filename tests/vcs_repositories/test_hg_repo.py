@@ -155,6 +155,60 @@ def test_get_tags(temp_hg_dir, empty_vcs_configuration):
     assert repo.get_tags() == 'tip'
 
 
+def test_list_tags(temp_hg_dir, empty_vcs_configuration):
+    repo = hr.HgRepo(temp_hg_dir, empty_vcs_configuration)
+    repo.tag("just_a_tag")
+
+    assert [name for name, node in repo.list_tags()] == ['just_a_tag']
+
+
+def test_get_status(temp_hg_dir, safe_devnull, empty_vcs_configuration):
+    hg_repo_add_file(temp_hg_dir, "added file.txt", "Added")
+    os.remove(os.path.join(temp_hg_dir, "README.md"))
+    with open(os.path.join(temp_hg_dir, "untracked.txt"), "w") as f:
+        f.write("Untracked")
+
+    repo = hr.HgRepo(temp_hg_dir, empty_vcs_configuration)
+
+    status = repo.get_status()
+
+    assert status.staged == {"added file.txt"}
+    assert status.unstaged == {"README.md"}
+    assert status.unmerged == set()
+    assert status.untracked == set()
+    assert not status.is_clean()
+
+    assert repo.get_status(untracked=True).untracked == {"untracked.txt"}
+
+
+def test_get_status_clean(temp_hg_dir, empty_vcs_configuration):
+    with open(os.path.join(temp_hg_dir, "untracked.txt"), "w") as f:
+        f.write("Untracked")
+
+    repo = hr.HgRepo(temp_hg_dir, empty_vcs_configuration)
+
+    assert repo.get_status().is_clean()
+
+
+def test_parse_status():
+    output = "\0".join([
+        "M modified.txt",
+        "A with space.txt",
+        "R removed.txt",
+        "! missing.txt",
+        "? untracked.txt",
+        ""
+    ])
+    resolve_output = "U conflict.txt\nR resolved.txt\n"
+
+    status = hr.HgRepo._parse_status(output, resolve_output)
+
+    assert status.staged == {"modified.txt", "with space.txt", "removed.txt"}
+    assert status.unstaged == {"missing.txt"}
+    assert status.unmerged == {"conflict.txt"}
+    assert status.untracked == {"untracked.txt"}
+
+
 def test_pre_start_release(temp_hg_dir, empty_vcs_configuration):
     repo = hr.HgRepo(temp_hg_dir, empty_vcs_configuration)
     repo.pre_start_release()
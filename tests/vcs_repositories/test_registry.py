@@ -0,0 +1,20 @@
+import pytest
+
+from punch.vcs_repositories import git_flow_repo as gfr
+from punch.vcs_repositories import git_repo as gr
+from punch.vcs_repositories import hg_repo as hr
+from punch.vcs_repositories import registry
+
+
+@pytest.mark.parametrize('name, repo_class', [
+    ('git', gr.GitRepo),
+    ('git-flow', gfr.GitFlowRepo),
+    ('hg', hr.HgRepo),
+])
+def test_repo_class(name, repo_class):
+    assert registry.repo_class(name) is repo_class
+
+
+def test_repo_class_unsupported():
+    with pytest.raises(ValueError):
+        registry.repo_class('svn')